@@ -0,0 +1,37 @@
+
+from typing import Callable
+
+class LazyProperty:
+    """
+    Descriptor that implements lazy evaluation for dataclass attributes.
+    The value is computed only once when first accessed, then cached.
+    A cached None counts as not computed, so the backing attribute can be 
+    a dataclass field defaulting to None. Supports cache invalidation via 
+    method call.
+    """
+    
+    def __init__(self, func: Callable):
+        self.func = func
+        
+    def __set_name__(self, owner, name):
+        """Called when the descriptor is assigned to a class attribute."""
+        self.attr_name = f'_lazy_{name}'
+        
+    def __get__(self, obj, objtype=None):
+        """
+        Called when the attribute is accessed.
+        Returns the cached value, computing and caching it on first access.
+        """
+        if obj is None:
+            return self
+        value = getattr(obj, self.attr_name, None)
+        if value is None:
+            value = self.func(obj)
+            setattr(obj, self.attr_name, value)
+        return value
+    
+    def __set__(self, obj, value):
+        setattr(obj, self.attr_name, value)
+        
+    def invalidate(self, obj):
+        setattr(obj, self.attr_name, None)
@@ -1,14 +1,16 @@
 from __future__ import annotations
 from typing import Optional, Callable, Any, Annotated, Union, Tuple, \
-    Generic, TypeVar
+    Generic, TypeVar, Sequence, List
 from dataclasses import dataclass, field
 from shapely import geometry
-import shapely.affinity
-from shapely.ops import transform
+import shapely
 from trackmarks.core.lazy import LazyProperty
 from trackmarks.core import unit_reg
 from pint.registry import Quantity
 import pyproj
+import numpy as np
+import functools
+import math
 import logging
 import geopandas as gpd
 
@@ -20,38 +22,87 @@ G = TypeVar('G', bound=geometry.base.BaseGeometry)
 DEFAULT_ELLIPSE_RESOLUTION = 8
 DEFAULT_ELLIPSE_ORIENTATION = 0.0
 DEFAULT_EPSG_CRS = 4326
+POLAR_CRS = 'ESRI:54032' # World Azimuthal Equidistant
 
-@dataclass
+@dataclass(slots=True)
 class Ellipse():
     
     centroid: geometry.Point #ESPG:4326 @TODO check/normalize on init
-    semi_major: float #nautical miles
-    semi_minor: float #nautical miles
+    semi_major: Distance
+    semi_minor: Distance
     orientation: float = field(default=DEFAULT_ELLIPSE_ORIENTATION)
     
-    #lazily computed
-    _ellipse: Optional[geometry.Polygon] = field(default=None, 
-                                                 init=False, 
-                                                 repr=False)
-    @property
+    #slot backing the lazily computed ellipse
+    _lazy_ellipse: Optional[geometry.Polygon] = field(default=None, init=False, 
+                                                      repr=False, compare=False)
+    
+    @LazyProperty
     def ellipse(self) -> geometry.Polygon:
-        #lazily_computed
-        if self._ellipse is None:
-            self.generate_ellipse(cache=True)
-        return self._ellipse
+        return self.generate_ellipse()
     
-    def generate_ellipse(self, resolution: float = DEFAULT_ELLIPSE_RESOLUTION,
-                         cache: bool = False) -> geometry.Polygon:
+    def generate_ellipse(self, resolution: float = DEFAULT_ELLIPSE_RESOLUTION) \
+        -> geometry.Polygon:
         reprojector = OptimalReprojector(input_epsg=DEFAULT_EPSG_CRS)
-        ellipse = reprojector.apply_geometry(self.centroid, 
+        return reprojector.apply_geometry(self.centroid, 
                                           func=Ellipse._generate_utm_ellipse,
                                           semi_major=self.semi_major,
                                           semi_minor=self.semi_minor,
                                           orientation=self.orientation,
                                           resolution=resolution)
+    
+    @classmethod
+    def batch_generate(cls, ellipses: Sequence[Ellipse], 
+                       resolution: float = DEFAULT_ELLIPSE_RESOLUTION,
+                       cache: bool = False) -> List[geometry.Polygon]:
+        """
+        Generate the polygons of many ellipses at once.
+        
+        Vertices are computed from a shared unit circle template with a 
+        single scale/rotate/translate pass per optimal CRS, rather than a 
+        buffer and affine transforms per ellipse.
+        """
+        if not ellipses:
+            return []
+        if len(ellipses) == 1:
+            polygons = [ellipses[0].generate_ellipse(resolution)]
+            if cache:
+                ellipses[0].ellipse = polygons[0]
+            return polygons
+        
+        reprojector = OptimalReprojector(input_epsg=DEFAULT_EPSG_CRS)
+        lons = np.array([e.centroid.x for e in ellipses], dtype=np.float64)
+        lats = np.array([e.centroid.y for e in ellipses], dtype=np.float64)
+        axes = np.array([(e.semi_major.to(unit_reg.meter).magnitude,
+                          e.semi_minor.to(unit_reg.meter).magnitude) 
+                         for e in ellipses], dtype=np.float64)
+        theta = np.radians([e.orientation for e in ellipses])
+        cos, sin = np.cos(theta), np.sin(theta)
+        rotations = np.stack([np.stack([cos, -sin], -1), 
+                              np.stack([sin, cos], -1)], 1)
+        
+        # scaled and rotated about the origin, (n, vertices, 2)
+        vertices = _unit_circle_coords(resolution)[None] * axes[:, None, :]
+        vertices = np.einsum('nij,nkj->nki', rotations, vertices)
+        
+        keys = _optimal_crs_keys(lons, lats)
+        for key in np.unique(keys):
+            rows = np.flatnonzero(keys == key)
+            transformers = reprojector.get_optimal_transformers(
+                geometry.Point(lons[rows[0]], lats[rows[0]]))
+            if transformers is None:
+                vertices[rows] += np.column_stack([lons[rows], lats[rows]])[:, None, :]
+                continue
+            xs, ys = transformers[0].transform(lons[rows], lats[rows])
+            group = vertices[rows] + np.column_stack([xs, ys])[:, None, :]
+            xs, ys = transformers[1].transform(group[..., 0].ravel(), 
+                                               group[..., 1].ravel())
+            vertices[rows] = np.stack([xs, ys], -1).reshape(group.shape)
+            
+        polygons = list(shapely.polygons(shapely.linearrings(vertices)))
         if cache:
-            self._ellipse = ellipse
-        return ellipse
+            for e, polygon in zip(ellipses, polygons):
+                e.ellipse = polygon
+        return polygons
         
     @staticmethod
     def _generate_utm_ellipse(centroid: geometry.Point, #utm
@@ -63,17 +114,113 @@ class Ellipse():
             
         major_meters = semi_major.to(unit_reg.meter).magnitude
         minor_meters = semi_minor.to(unit_reg.meter).magnitude
-        ellipse = shapely.affinity.scale(centroid.buffer(1,resolution=resolution), 
-                                         xfact=major_meters, 
-                                         yfact=minor_meters)
-        return ellipse if orientation == DEFAULT_ELLIPSE_ORIENTATION \
-            else shapely.affinity.rotate(ellipse, orientation)
+        # shaped about the origin from the cached template, then moved
+        coords = _unit_circle_coords(resolution) * (major_meters, minor_meters)
+        if not math.isclose(orientation, DEFAULT_ELLIPSE_ORIENTATION, abs_tol=1e-9):
+            theta = math.radians(orientation)
+            cos, sin = math.cos(theta), math.sin(theta)
+            coords = coords @ np.array([[cos, sin], [-sin, cos]])
+        return geometry.Polygon(coords + (centroid.x, centroid.y))
             
    
 
+@functools.lru_cache(maxsize=16)
+def _unit_circle_coords(resolution: int) -> np.ndarray:
+    """
+    Closed unit circle vertices, clockwise from (1, 0) as GEOS buffers them.
+    """
+    theta = np.linspace(0, -2 * np.pi, 4 * int(resolution) + 1)
+    coords = np.column_stack([np.cos(theta), np.sin(theta)])
+    coords[-1] = coords[0]
+    coords.flags.writeable = False
+    return coords
+
+@functools.lru_cache(maxsize=128)
+def _utm_crs(zone: int, south: bool = False) -> pyproj.CRS:
+    """
+    Cached WGS84 UTM CRS for the given zone and hemisphere, looked up by its
+    EPSG code (326xx north, 327xx south).
+    """
+    return pyproj.CRS.from_epsg((32700 if south else 32600) + zone)
+
+@functools.lru_cache(maxsize=1)
+def _polar_crs() -> pyproj.CRS:
+    return pyproj.CRS.from_user_input(POLAR_CRS)
+
+@functools.lru_cache(maxsize=256)
+def _make_transformer_pair(in_crs: pyproj.CRS, out_crs: pyproj.CRS) \
+    -> Tuple[pyproj.Transformer, pyproj.Transformer]:
+    """
+    Cached (forward, inverse) transformers between two CRS.
+    
+    Building a transformer parses both CRS definitions and assembles a PROJ
+    pipeline, which costs milliseconds; the pair is safe to reuse.
+    """
+    return (pyproj.Transformer.from_crs(in_crs, out_crs, always_xy=True),
+            pyproj.Transformer.from_crs(out_crs, in_crs, always_xy=True))
+
+def _optimal_crs_key(lon: float, lat: float) -> int:
+    """Scalar form of _optimal_crs_keys for a single point."""
+    return int(_optimal_crs_keys(lon, lat))
+
+def _crs_for_key(key: int) -> pyproj.CRS:
+    """The optimal CRS an _optimal_crs_keys key stands for."""
+    return _polar_crs() if key == 0 else _utm_crs(abs(key), key < 0)
+
+@functools.lru_cache(maxsize=256)
+def _zone_transformers(input_epsg: int, key: int) \
+    -> Optional[Tuple[pyproj.Transformer, pyproj.Transformer]]:
+    """
+    Cached (forward, inverse) transformers from an EPSG CRS to the optimal 
+    CRS of an _optimal_crs_keys key, None when the two are the same. Keyed 
+    on integers so a lookup skips hashing and comparing CRS definitions.
+    """
+    input_crs = pyproj.CRS.from_epsg(input_epsg)
+    optimal_crs = _crs_for_key(key)
+    if optimal_crs == input_crs:
+        return None
+    return _make_transformer_pair(input_crs, optimal_crs)
+
+def _optimal_crs_keys(lons: Union[float, np.ndarray],
+                      lats: Union[float, np.ndarray]) -> np.ndarray:
+    """
+    Optimal CRS of points as an integer key; signed UTM zone (negative in
+    the southern hemisphere), 0 for polar. This is the one place the zone
+    rule lives, see OptimalReprojector._determine_optimal_crs.
+    """
+    zones = np.floor_divide(lons + 180, 6).astype(int) % 60 + 1
+    keys = np.where(lats < 0, -zones, zones)
+    return np.where((lats > -80) & (lats < 84), keys, 0)
+
+def _transform_coordinates(transformer: pyproj.Transformer, 
+                           geoms: Union[G, np.ndarray]) -> Union[G, np.ndarray]:
+    """
+    Transform every vertex of a geometry, or array of geometries, in one 
+    pyproj call rather than one Python callback per vertex. Z coordinates 
+    are kept and transformed along with X and Y.
+    """
+    def transform_xy(coords):
+        return np.column_stack(transformer.transform(coords[:, 0], coords[:, 1]))
+    
+    def transform_xyz(coords):
+        return np.column_stack(transformer.transform(coords[:, 0], coords[:, 1], 
+                                                     coords[:, 2]))
+    
+    has_z = shapely.has_z(geoms)
+    if np.ndim(has_z) == 0:
+        return shapely.transform(geoms, transform_xyz if has_z else transform_xy, 
+                                 include_z=bool(has_z))
+    
+    # 2D geometries would come back with NaN Z if included
+    transformed = np.empty(len(geoms), dtype=object)
+    transformed[~has_z] = shapely.transform(geoms[~has_z], transform_xy)
+    transformed[has_z] = shapely.transform(geoms[has_z], transform_xyz, include_z=True)
+    return transformed
+
 class OptimalReprojector:
 
     def __init__(self, input_epsg: int = DEFAULT_EPSG_CRS):
+        self.input_epsg = input_epsg
         self.input_crs = pyproj.CRS.from_epsg(input_epsg)
 
     def _determine_optimal_crs(self, point_4326: geometry.Point) -> pyproj.CRS:
@@ -88,22 +235,11 @@ class OptimalReprojector:
         For a more advanced equal-area projection, a *Lambert Azimuthal 
         Equal Area (LAEA)* or a *custom Albers* might be chosen.
         """
-        lon = point_4326.x
-        lat = point_4326.y
-
         # UTM zones are generally good for local, low-distortion planar
         # calculations, though they are not equal-area. UTM is a common 
-        # *practical* 'optimal' choice for local distance/area.
-        # pyproj makes it easy to find the appropriate UTM CRS.
-        if -80 < lat < 84:
-            # Find the best UTM zone for the location
-            utm_crs = pyproj.CRS.from_string(f"+proj=utm +zone={int((lon + 180) / 6) + 1} +ellps=WGS84 +datum=WGS84 +units=m +no_defs")
-            return utm_crs
-        else:
-            # For polar regions, use a suitable polar stereographic or
-            # a standard continental Equal Area projection.
-            # Using World Azimuthal Equidistant for simplicity in edge cases.
-            return pyproj.CRS.from_epsg(54032) # World Azimuthal Equidistant
+        # *practical* 'optimal' choice for local distance/area. For polar 
+        # regions World Azimuthal Equidistant is used for simplicity.
+        return _crs_for_key(_optimal_crs_key(point_4326.x, point_4326.y))
 
     def _is_geometry_within_crs_bounds(geometry: geometry.base.BaseGeometry, 
                                       crs: pyproj.CRS):
@@ -120,42 +256,44 @@ class OptimalReprojector:
         
     
     def get_optimal_transformers(self, geom: geometry.base.Geometry) \
-        -> Tuple[pyproj.Transformer,pyproj.Transformer]:
+        -> Optional[Tuple[pyproj.Transformer,pyproj.Transformer]]:
         
-        #TODO determine if caching resolve transformers can optimize
-        optimal_crs = self._determine_optimal_crs(geom if isinstance(geom, geometry.Point) else geom.centroid)
-
-        if optimal_crs == self.input_crs:
-            return None
-
-        to_transformer = pyproj.Transformer.from_crs(
-            self.input_crs, 
-            optimal_crs, 
-            always_xy=True
-        )
-        
-        return_transformer = pyproj.Transformer.from_crs(
-            optimal_crs, 
-            self.input_crs, 
-            always_xy=True
-        )
-        
-        return (to_transformer, return_transformer)
+        point = geom if isinstance(geom, geometry.Point) else geom.centroid
+        return _zone_transformers(self.input_epsg, _optimal_crs_key(point.x, point.y))
     
     def apply_geometry(self, geom: G, func: Callable[G], *args, **kwargs) \
         -> geometry.base.BaseGeometry:
             
-        to_transformer, return_transformer = self.get_optimal_transformers(geom)
+        transformers = self.get_optimal_transformers(geom)
+        if transformers is None:
+            # already in the optimal CRS, nothing to transform
+            return func(geom, *args, **kwargs)
+        to_transformer, return_transformer = transformers
         
-        transformed_geom = transform(to_transformer.transform, geom)
+        transformed_geom = _transform_coordinates(to_transformer, geom)
         transformed_geom = func(transformed_geom, *args, **kwargs)
-        return transform(return_transformer.transform, transformed_geom)
+        return _transform_coordinates(return_transformer, transformed_geom)
     
     def apply_geodataframe(self, gdf: gpd.GeoDataFrame, func: Callable[G], *args, **kwargs) \
         -> gpd.GeoDataFrame:
-        gdf['geometry'] = gdf.apply(lambda x: self.apply_geometry(x.geometry, \
-                                                                  func, \
-                                                                      *args, \
-                                                                          **kwargs), axis=1)
+        geoms = np.asarray(gdf.geometry, dtype=object)
+        centroids = shapely.centroid(geoms)
+        keys = _optimal_crs_keys(shapely.get_x(centroids), 
+                                 shapely.get_y(centroids))
+        
+        # rows sharing an optimal CRS are projected together
+        results = np.empty(len(geoms), dtype=object)
+        for key in np.unique(keys):
+            rows = np.flatnonzero(keys == key)
+            transformers = self.get_optimal_transformers(centroids[rows[0]])
+            group = geoms[rows]
+            if transformers is not None:
+                group = _transform_coordinates(transformers[0], group)
+            group[:] = [func(geom, *args, **kwargs) for geom in group]
+            if transformers is not None:
+                group = _transform_coordinates(transformers[1], group)
+            results[rows] = group
+            
+        gdf['geometry'] = gpd.GeoSeries(results, index=gdf.index, crs=gdf.crs)
         return gdf
     
\ No newline at end of file
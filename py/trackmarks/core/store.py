@@ -4,7 +4,7 @@ from typing import Set, Iterable
 from dataclasses import dataclass, field
 from shapely import geometry
 from datetime import datetime
-from trackmarks.core.track import Trackable, DurableIdentifier, \
+from trackmarks.core.trackable import Trackable, DurableIdentifier, \
     DurableTrackable, TransientTrackable
 
 class TrackStore(ABC):
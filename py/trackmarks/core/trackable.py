@@ -11,8 +11,8 @@ from typing import Set
 import uuid
 from datetime import datetime
 import geopandas as gpd
-from trackable.core.spatial import Ellipse
-from trackable.core.track import Plot
+from trackmarks.core.spatial import Ellipse
+from trackmarks.core.track import Plot
 
     
 @dataclass
@@ -0,0 +1,27 @@
+import numpy as np
+
+def graph_to_csr(G, weight='length', node_to_idx=None):
+    """
+    Compressed sparse row arrays (indptr, indices, weights) of a graph with 
+    nodes labelled 0..N-1, or mapped to those positions by node_to_idx, 
+    keeping the lightest of any parallel edges. Zero weights are kept as 
+    explicit entries so they remain traversable. Edges without the weight 
+    attribute weigh 1 as in NetworkX. Weights are stored as float32, sums 
+    over them should be taken in float64.
+    """
+    edges = G.edges(data=weight, default=1)
+    position = (lambda node: node) if node_to_idx is None else node_to_idx.__getitem__
+    rows = np.fromiter((position(u) for u, _, _ in edges), dtype=np.int32, count=len(edges))
+    cols = np.fromiter((position(v) for _, v, _ in edges), dtype=np.int32, count=len(edges))
+    data = np.fromiter((w for _, _, w in edges), 
+                       dtype=np.float64, count=len(edges))
+    
+    # sort by row, column then weight so the lightest parallel edge leads
+    order = np.lexsort((data, cols, rows))
+    rows, cols, data = rows[order], cols[order], data[order]
+    lightest = np.ones(len(rows), dtype=bool)
+    lightest[1:] = (rows[1:] != rows[:-1]) | (cols[1:] != cols[:-1])
+    
+    indptr = np.zeros(len(G) + 1, dtype=np.int32)
+    np.cumsum(np.bincount(rows[lightest], minlength=len(G)), out=indptr[1:])
+    return indptr, cols[lightest], data[lightest].astype(np.float32)
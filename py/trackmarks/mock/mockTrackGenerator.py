@@ -2,9 +2,84 @@ import osmnx as ox
 import networkx as nx
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
 from skmob.core.trajectorydataframe import TrajDataFrame
-import random
+import math
+import logging
+import pyproj
+try:
+    from scipy.sparse import csr_matrix, csgraph
+    from scipy.spatial import cKDTree
+except ImportError:
+    csgraph = cKDTree = None
+from trackmarks.mock._csr import graph_to_csr
+
+logger = logging.getLogger(__name__)
+
+GPS_NOISE_DEGREES = 0.00001
+VELOCITY_VARIATION = (0.7, 1.3)
+TRAJECTORY_DTYPES = {'vehicle_id': np.int64,
+                     'lat': np.float64,
+                     'lng': np.float64,
+                     'datetime': 'datetime64[ns]',
+                     'velocity_kmh': np.float64}
+
+def _simulate(path_distances, node_xy, velocities_ms, sample_interval,
+              max_travel_duration_s, rest_duration_s, noise_std,
+              vel_var_lo, vel_var_hi, rng):
+    """
+    Sample noisy positions along a path until its end is reached, for 
+    vehicles with the given mean velocities (m/s).
+    
+    Per-sample velocities are independent, so the velocity increments of 
+    all vehicles are drawn in one go and travelled distances are their 
+    cumulative sums, then positions are interpolated for every sample at 
+    once.
+    
+    Returns, per sample grouped by vehicle, the vehicle's position in 
+    velocities_ms, the time offset from departure (s), latitude, longitude, 
+    velocity (m/s) and whether a rest was taken before it, and the time 
+    offset of each vehicle's arrival (s).
+    """
+    velocities_ms = np.atleast_1d(np.asarray(velocities_ms, dtype=np.float64))
+    total_distance = path_distances[-1]
+    
+    # enough samples to cover the path even at the slowest variation
+    capacity = (total_distance / (velocities_ms * vel_var_lo * sample_interval)).astype(np.int64) + 1
+    vehicles = np.repeat(np.arange(len(velocities_ms)), capacity)
+    velocities = velocities_ms[vehicles] * rng.uniform(vel_var_lo, vel_var_hi, len(vehicles))
+    steps = velocities * sample_interval
+    travelled = np.cumsum(steps)
+    # distance at each sample, from the departure of its own vehicle
+    departed = np.concatenate([[0.0], travelled[np.cumsum(capacity)[:-1] - 1]])
+    distances = travelled - steps - departed[vehicles]
+    moving = distances < total_distance
+    vehicles, velocities, distances = vehicles[moving], velocities[moving], distances[moving]
+    
+    # Interpolate positions between path nodes
+    next_idx = np.minimum(np.searchsorted(path_distances, distances), 
+                          len(path_distances) - 1)
+    prev_idx = np.maximum(next_idx - 1, 0)
+    span = path_distances[next_idx] - path_distances[prev_idx]
+    ratio = np.divide(distances - path_distances[prev_idx], span, 
+                      out=np.zeros_like(span), where=span > 0)
+    positions = node_xy[prev_idx] + ratio[:, None] * (node_xy[next_idx] - node_xy[prev_idx])
+    positions += rng.normal(0.0, noise_std, positions.shape)
+    
+    # A rest is taken before a sample once a leg's travel time is reached
+    samples_per_leg = math.ceil(max_travel_duration_s / sample_interval)
+    rest_count = (lambda idx: idx // samples_per_leg) if samples_per_leg > 0 \
+        else (lambda idx: idx + 1)
+    num_samples = np.bincount(vehicles, minlength=len(velocities_ms))
+    sample_idx = np.arange(len(vehicles)) - np.repeat(np.cumsum(num_samples) - num_samples, 
+                                                      num_samples)
+    rest_counts = rest_count(sample_idx)
+    t_offsets = sample_idx * sample_interval + rest_counts * rest_duration_s
+    rested = (rest_counts > 0) & ((sample_idx == 0) | (rest_count(sample_idx - 1) < rest_counts))
+    arrivals = num_samples * sample_interval + np.where(
+        num_samples > 0, rest_count(num_samples - 1), 0) * rest_duration_s
+    
+    return (vehicles, t_offsets, positions[:, 1], positions[:, 0], velocities,
+            rested, arrivals)
 
 class VehicleTrajectoryGenerator:
     """
@@ -22,17 +97,54 @@ class VehicleTrajectoryGenerator:
         if graph is not None:
             self.G = graph
         elif place_name is not None:
-            print(f"Downloading OSM data for {place_name}...")
+            logger.info("Downloading OSM data for %s...", place_name)
             self.G = ox.graph_from_place(place_name, network_type='drive')
         else:
             raise ValueError("Either place_name or graph must be provided")
         
         # Project graph to UTM for accurate distance calculations
         self.G_proj = ox.project_graph(self.G)
+        
+        # Node coordinates as contiguous arrays indexed by node position
+        self._nodes = list(self.G.nodes)
+        self._node_idx = {node: i for i, node in enumerate(self._nodes)}
+        self._node_x = np.fromiter((x for _, x in self.G.nodes(data='x')),
+                                   dtype=np.float64, count=len(self._nodes))
+        self._node_y = np.fromiter((y for _, y in self.G.nodes(data='y')),
+                                   dtype=np.float64, count=len(self._nodes))
+        
+        # Length weighted adjacency for compiled shortest path searches
+        self._csr = self._build_csr() if csgraph is not None else None
+        
+        # Spatial index over projected node coordinates for nearest node queries
+        self._to_proj = pyproj.Transformer.from_crs(self.G.graph['crs'], 
+                                                    self.G_proj.graph['crs'], 
+                                                    always_xy=True)
+        self._kdtree = cKDTree(
+            [(self.G_proj.nodes[node]['x'], self.G_proj.nodes[node]['y']) 
+             for node in self._nodes]) if cKDTree is not None else None
+    
+    def _build_csr(self):
+        """Sparse adjacency of the shortest edge length between each node pair."""
+        indptr, indices, lengths = graph_to_csr(self.G, node_to_idx=self._node_idx)
+        return csr_matrix((lengths, indices, indptr),
+                          shape=(len(self._nodes), len(self._nodes)))
     
     def get_nearest_node(self, lat, lon):
-        """Find nearest node in graph to given coordinates."""
-        return ox.distance.nearest_nodes(self.G, lon, lat)
+        """
+        Find nearest node in graph to given coordinates.
+        
+        lat and lon may be scalars or equal length arrays, in which case a 
+        list of nodes is returned.
+        """
+        if self._kdtree is None:
+            return ox.distance.nearest_nodes(self.G, lon, lat)
+        
+        xs, ys = self._to_proj.transform(lon, lat)
+        _, idx = self._kdtree.query(np.column_stack([np.ravel(xs), np.ravel(ys)]))
+        if np.ndim(lat) == 0:
+            return self._nodes[idx[0]]
+        return [self._nodes[i] for i in idx]
     
     def generate_trajectories(self, 
                             origin_coords,
@@ -43,7 +155,8 @@ class VehicleTrajectoryGenerator:
                             departure_time="2024-01-01 08:00:00",
                             max_travel_duration=120,
                             rest_duration=15,
-                            sample_interval=60):
+                            sample_interval=60,
+                            seed=None):
         """
         Generate vehicle trajectories based on user-defined criteria.
         
@@ -57,62 +170,73 @@ class VehicleTrajectoryGenerator:
             max_travel_duration: Maximum travel duration before rest/stop (minutes)
             rest_duration: Rest/stop duration (minutes)
             sample_interval: Time between GPS samples (seconds)
+            seed: Seed for the random number generator (optional)
         
         Returns:
             TrajDataFrame: Trajectory data frame with all vehicle tracks
         """
         
+        rng = np.random.default_rng(seed)
+        
         # Convert departure time to datetime
-        base_time = datetime.strptime(departure_time, "%Y-%m-%d %H:%M:%S")
+        base_time = np.datetime64(departure_time, 's')
         
         # Find nearest nodes for origin and destination
-        origin_node = self.get_nearest_node(origin_coords[0], origin_coords[1])
-        dest_node = self.get_nearest_node(dest_coords[0], dest_coords[1])
+        origin_node, dest_node = self.get_nearest_node(
+            [origin_coords[0], dest_coords[0]], [origin_coords[1], dest_coords[1]])
         
-        print(f"Origin node: {origin_node}")
-        print(f"Destination node: {dest_node}")
+        logger.debug("Origin node: %s", origin_node)
+        logger.debug("Destination node: %s", dest_node)
         
         # Calculate shortest path
-        try:
-            path = nx.shortest_path(self.G, origin_node, dest_node, weight='length')
-            print(f"Path found with {len(path)} nodes")
-        except nx.NetworkXNoPath:
-            print("No path found between origin and destination!")
+        shortest_path = self._shortest_path(origin_node, dest_node)
+        if shortest_path is None:
+            logger.warning("No path found between origin and destination!")
             return None
+        path, path_distances = shortest_path
+        logger.debug("Path found with %d nodes", len(path))
         
-        # Calculate path distances
-        path_distances = self._calculate_path_distances(path)
+        # Path coordinates
+        node_xy = self._path_coordinates(path)
         total_distance = path_distances[-1]
         
-        print(f"Total route distance: {total_distance/1000:.2f} km")
+        logger.info("Total route distance: %.2f km", total_distance / 1000)
+        
+        # Random velocity for each vehicle (km/h)
+        vehicle_velocities = rng.uniform(min_velocity, max_velocity, num_vehicles)
+        
+        # Stagger departure times slightly
+        vehicle_departures = base_time + rng.integers(
+            0, 30, num_vehicles, endpoint=True).astype('timedelta64[m]')
         
-        all_trajectories = []
+        # Simulate all vehicles at once
+        vehicles, t_offsets, lats, lons, velocities, rested, arrivals = _simulate(
+            path_distances, node_xy, vehicle_velocities / 3.6, float(sample_interval),
+            max_travel_duration * 60.0, rest_duration * 60.0, 
+            GPS_NOISE_DEGREES, *VELOCITY_VARIATION, rng)
         
-        # Generate trajectories for each vehicle
-        for vehicle_id in range(1, num_vehicles + 1):
-            print(f"\nGenerating trajectory for vehicle {vehicle_id}...")
-            
-            # Random velocity for this vehicle (km/h)
-            vehicle_velocity = random.uniform(min_velocity, max_velocity)
-            
-            # Stagger departure times slightly
-            vehicle_departure = base_time + timedelta(minutes=random.randint(0, 30))
-            
-            trajectory = self._generate_single_trajectory(
-                vehicle_id=vehicle_id,
-                path=path,
-                path_distances=path_distances,
-                velocity=vehicle_velocity,
-                departure_time=vehicle_departure,
-                max_travel_duration=max_travel_duration,
-                rest_duration=rest_duration,
-                sample_interval=sample_interval
-            )
-            
-            all_trajectories.append(trajectory)
+        if logger.isEnabledFor(logging.DEBUG):
+            rests = np.bincount(vehicles[rested], minlength=num_vehicles)
+            for vehicle_id, vehicle_rests in enumerate(rests, start=1):
+                logger.debug("Vehicle %d rested %d times", vehicle_id, vehicle_rests)
         
-        # Combine all trajectories
-        combined_df = pd.concat(all_trajectories, ignore_index=True)
+        # Combine samples into preallocated columns, each vehicle's samples 
+        # followed by its arrival at the final destination
+        points_per_vehicle = np.bincount(vehicles, minlength=num_vehicles) + 1
+        arrived = np.zeros(points_per_vehicle.sum(), dtype=bool)
+        arrived[np.cumsum(points_per_vehicle) - 1] = True
+        columns = {name: np.empty(len(arrived), dtype=dtype) 
+                   for name, dtype in TRAJECTORY_DTYPES.items()}
+        columns['vehicle_id'][:] = np.repeat(np.arange(1, num_vehicles + 1), points_per_vehicle)
+        columns['lat'][~arrived], columns['lat'][arrived] = lats, node_xy[-1, 1]
+        columns['lng'][~arrived], columns['lng'][arrived] = lons, node_xy[-1, 0]
+        columns['velocity_kmh'][~arrived], columns['velocity_kmh'][arrived] = velocities * 3.6, 0
+        offsets = np.empty(len(arrived))
+        offsets[~arrived], offsets[arrived] = t_offsets, arrivals
+        offsets_ns = np.round(offsets * 1e9).astype(np.int64).astype('timedelta64[ns]')
+        columns['datetime'][:] = np.repeat(vehicle_departures.astype('datetime64[ns]'), 
+                                           points_per_vehicle) + offsets_ns
+        combined_df = pd.DataFrame(columns)
         
         # Create TrajDataFrame
         tdf = TrajDataFrame(combined_df, 
@@ -121,103 +245,52 @@ class VehicleTrajectoryGenerator:
                            datetime='datetime', 
                            user_id='vehicle_id')
         
-        print(f"\nGenerated {len(combined_df)} GPS points for {num_vehicles} vehicles")
+        logger.info("Generated %d GPS points for %d vehicles", 
+                    len(combined_df), num_vehicles)
         
         return tdf
     
+    def _shortest_path(self, origin_node, dest_node):
+        """
+        Shortest path by length as node indices with the cumulative distance 
+        to each of them, None if unreachable.
+        """
+        source, target = self._node_idx[origin_node], self._node_idx[dest_node]
+        if self._csr is None:
+            try:
+                path = nx.shortest_path(self.G, origin_node, dest_node, weight='length')
+            except nx.NetworkXNoPath:
+                return None
+            path = np.array([self._node_idx[node] for node in path], dtype=np.intp)
+            return path, self._calculate_path_distances(path)
+        
+        distances, predecessors = csgraph.dijkstra(self._csr, indices=source, 
+                                                   return_predecessors=True)
+        if source != target and predecessors[target] < 0:
+            return None
+        path = [target]
+        while path[-1] != source:
+            path.append(predecessors[path[-1]])
+        path = np.array(path[::-1], dtype=np.intp)
+        return path, distances[path]
+    
     def _calculate_path_distances(self, path):
-        """Calculate cumulative distances along path."""
-        distances = [0]
-        for i in range(len(path) - 1):
-            edge_data = self.G[path[i]][path[i + 1]][0]
-            distances.append(distances[-1] + edge_data['length'])
-        return distances
+        """Calculate cumulative distances along path of node indices."""
+        edge_lengths = np.fromiter(
+            (min(edge['length'] for edge in self.G[self._nodes[u]][self._nodes[v]].values())
+             for u, v in zip(path[:-1], path[1:])),
+            dtype=np.float64, count=len(path) - 1)
+        return np.concatenate([[0.0], np.cumsum(edge_lengths)])
     
-    def _generate_single_trajectory(self, vehicle_id, path, path_distances, 
-                                   velocity, departure_time, max_travel_duration,
-                                   rest_duration, sample_interval):
-        """Generate trajectory for a single vehicle."""
-        
-        records = []
-        current_time = departure_time
-        velocity_ms = velocity / 3.6  # Convert km/h to m/s
-        
-        current_distance = 0
-        total_distance = path_distances[-1]
-        travel_time_minutes = 0
-        
-        while current_distance < total_distance:
-            # Check if vehicle needs rest
-            if travel_time_minutes >= max_travel_duration:
-                # Add rest period
-                current_time += timedelta(minutes=rest_duration)
-                travel_time_minutes = 0
-                print(f"  Vehicle {vehicle_id} resting at {current_distance/1000:.2f} km")
-            
-            # Find current position on path
-            node_idx = np.searchsorted(path_distances, current_distance)
-            if node_idx >= len(path):
-                node_idx = len(path) - 1
-            
-            # Interpolate position between nodes
-            if node_idx > 0 and node_idx < len(path):
-                prev_dist = path_distances[node_idx - 1]
-                next_dist = path_distances[node_idx]
-                ratio = (current_distance - prev_dist) / (next_dist - prev_dist) if next_dist > prev_dist else 0
-                
-                prev_node = path[node_idx - 1]
-                next_node = path[node_idx]
-                
-                prev_lat = self.G.nodes[prev_node]['y']
-                prev_lon = self.G.nodes[prev_node]['x']
-                next_lat = self.G.nodes[next_node]['y']
-                next_lon = self.G.nodes[next_node]['x']
-                
-                lat = prev_lat + ratio * (next_lat - prev_lat)
-                lon = prev_lon + ratio * (next_lon - prev_lon)
-            else:
-                # Use exact node position
-                node = path[node_idx]
-                lat = self.G.nodes[node]['y']
-                lon = self.G.nodes[node]['x']
-            
-            # Add some GPS noise (realistic variation)
-            lat += random.gauss(0, 0.00001)
-            lon += random.gauss(0, 0.00001)
-            
-            # Add velocity variation (traffic, acceleration, etc.)
-            velocity_variation = random.uniform(0.7, 1.3)
-            actual_velocity = velocity_ms * velocity_variation
-            
-            records.append({
-                'vehicle_id': vehicle_id,
-                'lat': lat,
-                'lng': lon,
-                'datetime': current_time,
-                'velocity_kmh': actual_velocity * 3.6
-            })
-            
-            # Move to next sample
-            distance_increment = actual_velocity * sample_interval
-            current_distance += distance_increment
-            current_time += timedelta(seconds=sample_interval)
-            travel_time_minutes += sample_interval / 60
-        
-        # Ensure final destination is included
-        dest_node = path[-1]
-        records.append({
-            'vehicle_id': vehicle_id,
-            'lat': self.G.nodes[dest_node]['y'],
-            'lng': self.G.nodes[dest_node]['x'],
-            'datetime': current_time,
-            'velocity_kmh': 0
-        })
-        
-        return pd.DataFrame(records)
+    def _path_coordinates(self, path):
+        """Node (lon, lat) coordinates along path of node indices as an (n, 2) array."""
+        return np.column_stack([self._node_x[path], self._node_y[path]])
 
 
 # Example usage
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    
     # Configuration parameters
     CONFIG = {
         'place_name': "Piedmont, Atlanta, Georgia, USA",
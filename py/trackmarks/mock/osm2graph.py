@@ -1,85 +1,517 @@
 import osmnx as ox
 import networkx as nx
-import matplotlib.pyplot as plt
-from matplotlib.lines import Line2D
+import numpy as np
+import hashlib
+import logging
+import os
+import pyproj
+from numba import njit
+from scipy.sparse import csr_matrix, csgraph
+from scipy.spatial import cKDTree
+from trackmarks.mock._csr import graph_to_csr
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_M = 6371009.0
+
+# Part of the graph cache key, bump whenever the cached files change layout.
+# 2: GraphML relabelled to node positions, npz 'nodes' renamed 'osm_ids'
+_CACHE_VERSION = 2
+
+
+@njit('float64(float64[:, :], float64[:, :], int64, int64)', cache=True)
+def _landmark_bound(lm_from, lm_to, v, t):
+    """
+    ALT lower bound on the distance from v to t by the triangle inequality 
+    over landmark distances, inf when v provably cannot reach t.
+    """
+    bound = 0.0
+    for k in range(lm_from.shape[0]):
+        # NaN from two unreachable terms compares false and is skipped
+        forward = lm_from[k, t] - lm_from[k, v]
+        backward = lm_to[k, v] - lm_to[k, t]
+        if forward > bound:
+            bound = forward
+        if backward > bound:
+            bound = backward
+    return bound
+
+
+@njit('float64(float64[:, :], float64[:], int64, int64)', cache=True)
+def _haversine(node_rad, cos_lat, v, t):
+    """Great circle distance in meters between nodes given as (lat, lon) radians."""
+    half_dlat = 0.5 * (node_rad[t, 0] - node_rad[v, 0])
+    half_dlon = 0.5 * (node_rad[t, 1] - node_rad[v, 1])
+    a = np.sin(half_dlat) ** 2 + cos_lat[v] * cos_lat[t] * np.sin(half_dlon) ** 2
+    return 2.0 * EARTH_RADIUS_M * np.arcsin(np.sqrt(min(a, 1.0)))
+
+
+@njit(cache=True)
+def _heap_push(keys, items, size, key, item):
+    """Push onto a binary min heap held in arrays, returning the new size."""
+    i = size
+    while i > 0:
+        parent = (i - 1) >> 1
+        if keys[parent] <= key:
+            break
+        keys[i] = keys[parent]
+        items[i] = items[parent]
+        i = parent
+    keys[i] = key
+    items[i] = item
+    return size + 1
+
+
+@njit(cache=True)
+def _heap_pop(keys, items, size):
+    """Pop the minimum item of a binary min heap held in arrays, returning it and the new size."""
+    top = items[0]
+    size -= 1
+    key, item = keys[size], items[size]
+    i = 0
+    while True:
+        child = 2 * i + 1
+        if child >= size:
+            break
+        if child + 1 < size and keys[child + 1] < keys[child]:
+            child += 1
+        if key <= keys[child]:
+            break
+        keys[i] = keys[child]
+        items[i] = items[child]
+        i = child
+    keys[i] = key
+    items[i] = item
+    return top, size
+
+
+@njit('Tuple((float64, int32[:]))(int32[:], int32[:], float32[:], float64[:, :], float64[:, :], '
+      'float64[:, :], float64[:], float64, int64, int64)', cache=True)
+def _astar(indptr, indices, weights, lm_from, lm_to, node_rad, cos_lat, geo_scale, 
+           src, dst):
+    """
+    Single pair A* over CSR arrays. The heuristic is the larger of the ALT 
+    bound from landmark distances from (lm_from) and to (lm_to) each 
+    landmark, shaped (landmarks, nodes), and the great circle distance to 
+    dst scaled by geo_scale, the least weight per meter of any edge. With 
+    no landmarks and a zero scale this is Dijkstra stopping once the 
+    destination is settled.
+    
+    Returns the distance to dst (inf if unreachable) and the predecessor of 
+    every settled or reached node (-1 otherwise).
+    """
+    num_nodes = len(indptr) - 1
+    dist = np.full(num_nodes, np.inf)
+    pred = np.full(num_nodes, -1, dtype=np.int32)
+    settled = np.zeros(num_nodes, dtype=np.bool_)
+    
+    # every push relaxes an edge, so the heap never outgrows the edge count
+    keys = np.empty(len(indices) + 1)
+    items = np.empty(len(indices) + 1, dtype=np.int64)
+    use_geo = geo_scale > 0.0
+    
+    dist[src] = 0.0
+    size = _heap_push(keys, items, 0, 0.0, src)
+    while size > 0:
+        u, size = _heap_pop(keys, items, size)
+        if settled[u]:
+            continue
+        settled[u] = True
+        if u == dst:
+            break
+        d = dist[u]
+        for j in range(indptr[u], indptr[u + 1]):
+            v = indices[j]
+            nd = d + weights[j]
+            if nd < dist[v]:
+                bound = _landmark_bound(lm_from, lm_to, v, dst)
+                if np.isinf(bound):
+                    continue
+                if use_geo:
+                    bound = max(bound, geo_scale * _haversine(node_rad, cos_lat, v, dst))
+                dist[v] = nd
+                pred[v] = u
+                size = _heap_push(keys, items, size, nd + bound, v)
+    return dist[dst], pred
+
+
+@njit(['uint64(uint64)', 'uint64[:](uint64[:])'], cache=True)
+def _interleave_bits(v):
+    """Spread the low 32 bits of uint64 values to the even bit positions."""
+    v = v & np.uint64(0x00000000FFFFFFFF)
+    v = (v | (v << np.uint64(16))) & np.uint64(0x0000FFFF0000FFFF)
+    v = (v | (v << np.uint64(8))) & np.uint64(0x00FF00FF00FF00FF)
+    v = (v | (v << np.uint64(4))) & np.uint64(0x0F0F0F0F0F0F0F0F)
+    v = (v | (v << np.uint64(2))) & np.uint64(0x3333333333333333)
+    v = (v | (v << np.uint64(1))) & np.uint64(0x5555555555555555)
+    return v
+
+
+@njit('uint64(uint64, uint64, uint64)', cache=True)
+def _bigmin(code, zmin, zmax):
+    """
+    Smallest Morton code above code that lies inside the box with corner 
+    codes zmin and zmax (Tropf and Herzog's BIGMIN), for code inside the 
+    code range of the box but outside the box itself.
+    """
+    one = np.uint64(1)
+    even = np.uint64(0x5555555555555555)
+    bigmin = np.uint64(0)
+    for bitpos in range(63, -1, -1):
+        bit = one << np.uint64(bitpos)
+        # lower bits of the same axis as this bit
+        lower = (bit - one) & (even << np.uint64(bitpos & 1))
+        in_code = (code & bit) != 0
+        in_min = (zmin & bit) != 0
+        in_max = (zmax & bit) != 0
+        if not in_code and not in_min and in_max:
+            bigmin = (zmin & ~lower) | bit
+            zmax = (zmax & ~bit) | lower
+        elif not in_code and in_min and in_max:
+            return zmin
+        elif in_code and not in_min and not in_max:
+            return bigmin
+        elif in_code and not in_min and in_max:
+            zmin = (zmin & ~lower) | bit
+    return bigmin
+
+
+@njit('uint64[:, :](float64[:, :], float64[:], float64)', cache=True)
+def _cells(points, origin, scale):
+    """Points quantized to 32 bit cells per axis, clipped to the grid, (n, 2)."""
+    top = float(2 ** 32 - 1)
+    cells = np.empty(points.shape, dtype=np.uint64)
+    for i in range(points.shape[0]):
+        for axis in range(2):
+            cell = np.floor((points[i, axis] - origin[axis]) * scale)
+            cells[i, axis] = np.uint64(min(max(cell, 0.0), top))
+    return cells
+
+
+@njit('Tuple((float64[:], int64[:]))(float64[:, :], uint64[:, :], uint64[:], '
+      'float64[:, :], float64[:], float64, int64)', cache=True)
+def _zorder_nearest(points, cells, zcodes, queries, origin, scale, window):
+    """
+    Nearest of points, sorted by their Morton codes zcodes, to each query. 
+    The curve neighbours of the query's code give a first candidate, then 
+    only the runs of codes inside the box around the query with the best 
+    candidate's radius are scanned, jumping over codes outside the box 
+    with BIGMIN. Any closer point lies in that box, so results are exact.
+    
+    Returns distances and positions in the sorted points.
+    """
+    n = len(zcodes)
+    dist = np.empty(len(queries))
+    idx = np.empty(len(queries), dtype=np.int64)
+    query_cells = _cells(queries, origin, scale)
+    corners = np.empty((2, 2))
+    for i in range(len(queries)):
+        qx, qy = queries[i, 0], queries[i, 1]
+        
+        # first candidate from the curve neighbours of the query
+        code = _interleave_bits(query_cells[i, 0]) | (_interleave_bits(query_cells[i, 1]) << np.uint64(1))
+        start = np.searchsorted(zcodes, code)
+        best, best_pos = np.inf, -1
+        for j in range(max(start - window, 0), min(start + window, n)):
+            squared = (points[j, 0] - qx) ** 2 + (points[j, 1] - qy) ** 2
+            if squared < best:
+                best, best_pos = squared, j
+        
+        # scan the runs of codes inside the box holding anything closer, 
+        # shrinking it once a candidate halves its radius
+        radius = np.inf
+        j = 0
+        while j < n:
+            if np.sqrt(best) < 0.5 * radius:
+                radius = np.sqrt(best)
+                corners[0, 0], corners[0, 1] = qx - radius, qy - radius
+                corners[1, 0], corners[1, 1] = qx + radius, qy + radius
+                box = _cells(corners, origin, scale)
+                zmin = _interleave_bits(box[0, 0]) | (_interleave_bits(box[0, 1]) << np.uint64(1))
+                zmax = _interleave_bits(box[1, 0]) | (_interleave_bits(box[1, 1]) << np.uint64(1))
+                if zcodes[j] < zmin:
+                    j = np.searchsorted(zcodes, zmin)
+                    continue
+            if zcodes[j] > zmax:
+                break
+            if (cells[j, 0] < box[0, 0] or cells[j, 0] > box[1, 0] 
+                    or cells[j, 1] < box[0, 1] or cells[j, 1] > box[1, 1]):
+                j = np.searchsorted(zcodes, _bigmin(zcodes[j], zmin, zmax))
+                continue
+            squared = (points[j, 0] - qx) ** 2 + (points[j, 1] - qy) ** 2
+            if squared < best:
+                best, best_pos = squared, j
+            j += 1
+        dist[i] = np.sqrt(best)
+        idx[i] = best_pos
+    return dist, idx
+
+
+class _ZOrderIndex:
+    """
+    Nearest neighbour index over 2D points sorted along a Morton (z-order) 
+    curve. Building is a single sort, queries are answered by 
+    _zorder_nearest.
+    
+    Mirrors the cKDTree.query interface for 2D points and k=1.
+    """
+    
+    WINDOW = 16
+    
+    def __init__(self, points):
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        self._origin = points.min(axis=0)
+        extent = float((points.max(axis=0) - self._origin).max())
+        self._scale = (2 ** 32 - 1) / max(extent, 1.0)
+        cells = _cells(points, self._origin, self._scale)
+        codes = _interleave_bits(cells[:, 0]) | (_interleave_bits(cells[:, 1]) << np.uint64(1))
+        self._order = np.argsort(codes, kind='stable')
+        self._zcodes = codes[self._order]
+        self._cells = cells[self._order]
+        self._points = points[self._order]
+    
+    def query(self, points):
+        """Distances to and positions of the nearest point to each of points."""
+        points = np.ascontiguousarray(np.atleast_2d(points), dtype=np.float64)
+        dist, pos = _zorder_nearest(self._points, self._cells, self._zcodes, points, 
+                                    self._origin, self._scale, self.WINDOW)
+        return dist, self._order[pos]
+
 
 class ShortestPathGenerator:
     """
     Generate shortest distance graph using OSM roads between origin and destination.
     """
     
-    def __init__(self, place_name=None, bbox=None, distance=None, center_point=None):
+    def __init__(self, place_name=None, bbox=None, distance=None, center_point=None, 
+                 num_landmarks=8, cache_dir=None, spatial_index='kdtree', graph=None):
         """
-        Initialize by downloading OSM data.
+        Initialize by downloading OSM data, or with an existing graph.
         
         Args:
             place_name: Name of place (e.g., "Manhattan, New York, USA")
             bbox: Bounding box as (north, south, east, west)
             distance: Distance in meters from center_point to download
             center_point: Tuple of (lat, lon) for distance-based download
+            num_landmarks: Landmarks guiding repeated path queries, 0 to 
+                always search with plain Dijkstra
+            cache_dir: Optional directory to persist the prepared graph and 
+                routing arrays in, keyed on the download arguments
+            spatial_index: Nearest node index, 'kdtree' or 'zorder' for a 
+                Morton curve index, quicker to build on very large graphs 
+                but slower for points far outside the graph
+            graph: Pre-loaded OSMnx graph used instead of downloading one, 
+                never cached
         """
-        if place_name:
-            print(f"Downloading OSM data for {place_name}...")
-            self.G = ox.graph_from_place(place_name, network_type='drive')
-        elif bbox:
-            print(f"Downloading OSM data for bounding box...")
-            self.G = ox.graph_from_bbox(bbox=bbox, network_type='drive')
-        elif distance and center_point:
-            print(f"Downloading OSM data within {distance}m of {center_point}...")
-            self.G = ox.graph_from_point(center_point, dist=distance, network_type='drive')
+        if spatial_index not in ('kdtree', 'zorder'):
+            raise ValueError(f"Unknown spatial_index {spatial_index!r}, use 'kdtree' or 'zorder'")
+        if graph is None and not (place_name or bbox or (distance and center_point)):
+            raise ValueError("Must provide place_name, bbox, (distance and center_point) or graph")
+        
+        cache_path = None
+        if cache_dir is not None and graph is None:
+            key = repr((_CACHE_VERSION, place_name, bbox, distance, center_point))
+            cache_path = os.path.join(cache_dir, hashlib.sha1(key.encode()).hexdigest())
+        
+        if cache_path and os.path.exists(cache_path + '.graphml') \
+            and os.path.exists(cache_path + '.npz'):
+            logger.info("Loading cached graph from %s.graphml...", cache_path)
+            self.G = ox.load_graphml(cache_path + '.graphml')
+            proj_crs = self._load_arrays(cache_path + '.npz')
         else:
-            raise ValueError("Must provide place_name, bbox, or (distance and center_point)")
+            if graph is not None:
+                self.G = graph
+            elif place_name:
+                logger.info("Downloading OSM data for %s...", place_name)
+                self.G = ox.graph_from_place(place_name, network_type='drive')
+            elif bbox:
+                logger.info("Downloading OSM data for bounding box %s...", bbox)
+                self.G = ox.graph_from_bbox(bbox=bbox, network_type='drive')
+            else:
+                logger.info("Downloading OSM data within %sm of %s...", distance, center_point)
+                self.G = ox.graph_from_point(center_point, dist=distance, network_type='drive')
+            proj_crs = self._build_arrays()
+            if cache_path:
+                os.makedirs(cache_dir, exist_ok=True)
+                ox.save_graphml(self.G, cache_path + '.graphml')
+                self._save_arrays(cache_path + '.npz', proj_crs)
         
-        print(f"Graph loaded: {len(self.G.nodes)} nodes, {len(self.G.edges)} edges")
-    
-    def get_nearest_node(self, lat, lon):
-        """Find nearest node in graph to given coordinates."""
-        node = ox.distance.nearest_nodes(self.G, lon, lat)
-        node_data = self.G.nodes[node]
-        print(f"Nearest node to ({lat}, {lon}): {node} at ({node_data['y']:.6f}, {node_data['x']:.6f})")
-        return node
-    
-    def calculate_shortest_path(self, origin_coords, dest_coords, weight='length'):
-        """
-        Calculate shortest path between origin and destination.
+        logger.info("Graph loaded: %d nodes, %d edges", len(self.G.nodes), len(self.G.edges))
         
-        Args:
-            origin_coords: Tuple of (latitude, longitude) for origin
-            dest_coords: Tuple of (latitude, longitude) for destination
-            weight: Edge weight to minimize ('length' for distance, 'travel_time' for time)
+        # Simple graph keeping the shortest of any parallel edges, the edge 
+        # a route takes between two nodes
+        shortest = {}
+        for u, v, data in self.G.edges(data=True):
+            kept = shortest.get((u, v))
+            if kept is None or data['length'] < kept['length']:
+                shortest[u, v] = data
+        self.G_simple = nx.DiGraph()
+        self.G_simple.add_nodes_from(self.G.nodes(data=True))
+        self.G_simple.add_edges_from((u, v, data) for (u, v), data in shortest.items())
         
-        Returns:
-            dict: Contains path nodes, edges, distance, and other metrics
+        # Weights other than length are built lazily
+        self._csr = {}
+        self.num_landmarks = num_landmarks
+        self._landmarks = {}
+        self._no_landmarks = np.empty((0, len(self._osm_ids)))
+        self._geo_scales = {}
+        self._node_rad = np.radians(self._node_xy)
+        self._cos_lat = np.cos(self._node_rad[:, 0])
+        
+        # Nearest node index in meters over the UTM projected nodes
+        self._to_proj = pyproj.Transformer.from_crs(self.G.graph['crs'], proj_crs, 
+                                                    always_xy=True)
+        index = cKDTree if spatial_index == 'kdtree' else _ZOrderIndex
+        self._node_index = index(self._node_xy_proj)
+    
+    def _build_arrays(self):
+        """
+        Relabel self.G to node positions 0..N-1, keeping the OSM ids in 
+        _osm_ids, and build the array layout of the graph for routing: length 
+        CSR arrays, node (lat, lon) for route coordinates and node (x, y) on 
+        a UTM projected copy of the graph. Returns the projected CRS.
         """
-        print("\n=== Calculating Shortest Path ===")
+        self._osm_ids = np.fromiter(self.G.nodes, dtype=np.int64, count=len(self.G))
+        self._node_to_idx = {node: i for i, node in enumerate(self._osm_ids.tolist())}
+        self.G = nx.relabel_nodes(self.G, self._node_to_idx)
         
-        # Find nearest nodes
-        origin_node = self.get_nearest_node(origin_coords[0], origin_coords[1])
-        dest_node = self.get_nearest_node(dest_coords[0], dest_coords[1])
+        self._indptr, self._indices, self._weights = graph_to_csr(self.G, weight='length')
+        self._node_xy = np.array([(self.G.nodes[i]['y'], self.G.nodes[i]['x']) 
+                                  for i in range(len(self._osm_ids))])
+        G_proj = ox.project_graph(self.G)
+        self._node_xy_proj = np.array([(G_proj.nodes[i]['x'], G_proj.nodes[i]['y']) 
+                                       for i in range(len(self._osm_ids))])
+        return pyproj.CRS.from_user_input(G_proj.graph['crs'])
+    
+    def _save_arrays(self, path, proj_crs):
+        """Persist the arrays of _build_arrays to an npz file."""
+        np.savez_compressed(path, 
+                            osm_ids=self._osm_ids, 
+                            indptr=self._indptr, 
+                            indices=self._indices, 
+                            weights=self._weights, 
+                            node_xy=self._node_xy, 
+                            node_xy_proj=self._node_xy_proj, 
+                            proj_crs=proj_crs.to_wkt())
+    
+    def _load_arrays(self, path):
+        """Restore the arrays saved by _save_arrays, returning the projected CRS."""
+        with np.load(path) as arrays:
+            self._osm_ids = arrays['osm_ids']
+            self._indptr = arrays['indptr']
+            self._indices = arrays['indices']
+            self._weights = arrays['weights']
+            self._node_xy = arrays['node_xy']
+            self._node_xy_proj = arrays['node_xy_proj']
+            proj_crs = pyproj.CRS.from_wkt(str(arrays['proj_crs']))
+        self._node_to_idx = {node: i for i, node in enumerate(self._osm_ids.tolist())}
+        return proj_crs
+    
+    def _weight_matrix(self, weight):
+        """
+        Sparse matrix view of the CSR arrays for a weight attribute, cached 
+        per weight. Lengths share the arrays built at initialization.
+        """
+        if weight not in self._csr:
+            if weight == 'length':
+                arrays = self._indptr, self._indices, self._weights
+            else:
+                arrays = graph_to_csr(self.G, weight=weight)
+            indptr, indices, weights = arrays
+            self._csr[weight] = csr_matrix((weights, indices, indptr), 
+                                           shape=(len(indptr) - 1, len(indptr) - 1))
+        return self._csr[weight]
+    
+    def _landmark_distances(self, weight):
+        """
+        Distances from and to a set of landmark nodes for a weight, each 
+        shaped (landmarks, nodes). Landmarks start at the highest degree 
+        node, each next one being the node farthest from those chosen. 
         
-        # Calculate shortest path
-        try:
-            route = nx.shortest_path(self.G, origin_node, dest_node, weight=weight)
-            print(f"\nPath found with {len(route)} nodes")
-        except nx.NetworkXNoPath:
-            print("ERROR: No path found between origin and destination!")
+        They are computed on the second query with a weight, so a one-off 
+        query does not pay for them.
+        """
+        landmarks = self._landmarks.get(weight)
+        if landmarks is None:
+            self._landmarks[weight] = False
+            return self._no_landmarks, self._no_landmarks
+        if landmarks is False:
+            csr = self._weight_matrix(weight)
+            chosen = [int(np.argmax(np.diff(csr.indptr)))]
+            lm_from = [csgraph.dijkstra(csr, indices=chosen[0])]
+            nearest = lm_from[0].copy()
+            while len(chosen) < min(self.num_landmarks, csr.shape[0]):
+                farthest = np.where(np.isfinite(nearest), nearest, -1)
+                landmark = int(np.argmax(farthest))
+                if farthest[landmark] <= 0:
+                    break
+                chosen.append(landmark)
+                lm_from.append(csgraph.dijkstra(csr, indices=landmark))
+                np.minimum(nearest, lm_from[-1], out=nearest)
+            lm_to = csgraph.dijkstra(csr.T, indices=chosen)
+            landmarks = self._landmarks[weight] = np.array(lm_from), lm_to
+        return landmarks
+    
+    def _geo_scale(self, weight):
+        """
+        Least weight per meter of great circle distance over all edges, 
+        cached per weight. Scaled great circle distance to the destination 
+        is then a lower bound on the remaining weight of any path.
+        """
+        if weight not in self._geo_scales:
+            csr = self._weight_matrix(weight)
+            rows = np.repeat(np.arange(csr.shape[0]), np.diff(csr.indptr))
+            rad = self._node_rad
+            a = (np.sin(0.5 * (rad[csr.indices, 0] - rad[rows, 0])) ** 2 
+                 + self._cos_lat[rows] * self._cos_lat[csr.indices] 
+                 * np.sin(0.5 * (rad[csr.indices, 1] - rad[rows, 1])) ** 2)
+            meters = 2.0 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+            apart = meters > 0
+            scale = np.min(csr.data[apart] / meters[apart]) if apart.any() else 0.0
+            # shaved so rounding in the kernel cannot overestimate
+            self._geo_scales[weight] = float(scale) * (1 - 1e-9)
+        return self._geo_scales[weight]
+    
+    def _edge_lengths(self, route_idx):
+        """Lengths of the edges along a route of node positions."""
+        route_idx = np.asarray(route_idx)
+        if len(route_idx) < 2:
+            return np.empty(0)
+        lengths = self._weight_matrix('length')[route_idx[:-1], route_idx[1:]]
+        return np.asarray(lengths, dtype=np.float64).ravel()
+    
+    def _nearest_idx(self, lats, lons):
+        """Positions of the nearest nodes to coordinate arrays."""
+        _, idx = self._node_index.query(np.column_stack(self._to_proj.transform(lons, lats)))
+        return idx
+    
+    @staticmethod
+    def _route_from_predecessors(predecessors, source, target):
+        """Node positions from source to target, None if target was not reached."""
+        if source != target and predecessors[target] < 0:
             return None
+        route_idx = [target]
+        while route_idx[-1] != source:
+            route_idx.append(predecessors[route_idx[-1]])
+        return np.array(route_idx[::-1])
+    
+    def _path_results(self, origin_coords, dest_coords, route_idx):
+        """Results dictionary of a route given as node positions."""
+        route = self._osm_ids[route_idx].tolist()
         
         # Calculate path metrics
-        path_length = sum(
-            self.G[route[i]][route[i + 1]][0]['length'] 
-            for i in range(len(route) - 1)
-        )
+        path_length = float(self._edge_lengths(route_idx).sum())
         
         # Get path edges for visualization
-        route_edges = [(route[i], route[i + 1]) for i in range(len(route) - 1)]
+        route_ids = np.asarray(route)
+        route_edges = np.column_stack([route_ids[:-1], route_ids[1:]])
         
         # Calculate additional metrics
-        path_coords = [(self.G.nodes[node]['y'], self.G.nodes[node]['x']) for node in route]
+        path_coords = self._node_xy[route_idx]
         
-        results = {
-            'origin_node': origin_node,
-            'dest_node': dest_node,
+        return {
+            'origin_node': route[0],
+            'dest_node': route[-1],
             'origin_coords': origin_coords,
             'dest_coords': dest_coords,
             'route_nodes': route,
@@ -90,12 +522,100 @@ class ShortestPathGenerator:
             'num_nodes': len(route),
             'num_edges': len(route_edges)
         }
+    
+    def get_nearest_node(self, lat, lon):
+        """Find nearest node in graph to given coordinates, scalars or arrays."""
+        lats, lons = np.ravel(lat), np.ravel(lon)
+        idx = self._nearest_idx(lats, lons)
+        nodes = self._osm_ids[idx].tolist()
+        if logger.isEnabledFor(logging.DEBUG):
+            for node_lat, node_lon, node, (y, x) in zip(lats, lons, nodes, self._node_xy[idx]):
+                logger.debug("Nearest node to (%s, %s): %s at (%.6f, %.6f)", 
+                             node_lat, node_lon, node, y, x)
+        return nodes if np.ndim(lat) else nodes[0]
+    
+    def calculate_shortest_path(self, origin_coords, dest_coords, weight='length'):
+        """
+        Calculate shortest path between origin and destination.
         
-        print(f"\n=== Path Statistics ===")
-        print(f"Distance: {results['distance_km']:.2f} km ({results['distance_meters']:.0f} m)")
-        print(f"Nodes in path: {results['num_nodes']}")
-        print(f"Edges in path: {results['num_edges']}")
+        Args:
+            origin_coords: Tuple of (latitude, longitude) for origin
+            dest_coords: Tuple of (latitude, longitude) for destination
+            weight: Edge weight to minimize ('length' for distance, 'travel_time' for time)
         
+        Returns:
+            dict: Contains path nodes, edges, distance, and other metrics. 
+                Edges are an (edges, 2) array of node pairs and coordinates 
+                a (nodes, 2) array of (lat, lon).
+        """
+        # Find nearest nodes in one query
+        origin_node, dest_node = self.get_nearest_node(
+            [origin_coords[0], dest_coords[0]], [origin_coords[1], dest_coords[1]])
+        
+        # Calculate shortest path
+        source, target = self._node_to_idx[origin_node], self._node_to_idx[dest_node]
+        csr = self._weight_matrix(weight)
+        lm_from, lm_to = (self._landmark_distances(weight) if self.num_landmarks 
+                          else (self._no_landmarks, self._no_landmarks))
+        cost, predecessors = _astar(csr.indptr, csr.indices, csr.data, 
+                                    lm_from, lm_to, self._node_rad, self._cos_lat, 
+                                    self._geo_scale(weight), source, target)
+        if np.isinf(cost):
+            logger.warning("No path found between origin and destination!")
+            return None
+        route_idx = self._route_from_predecessors(predecessors, source, target)
+        logger.debug("Path found with %d nodes", len(route_idx))
+        
+        results = self._path_results(origin_coords, dest_coords, route_idx)
+        
+        logger.debug("Distance: %.2f km (%.0f m), %d nodes, %d edges", 
+                     results['distance_km'], results['distance_meters'], 
+                     results['num_nodes'], results['num_edges'])
+        
+        return results
+    
+    def calculate_shortest_paths(self, origins, destinations, weight='length'):
+        """
+        Calculate shortest paths for many origin/destination pairs, solving 
+        once per distinct origin node.
+        
+        Args:
+            origins: Iterable of (latitude, longitude) origins
+            destinations: Iterable of (latitude, longitude) destinations, 
+                paired with origins
+            weight: Edge weight to minimize ('length' for distance, 'travel_time' for time)
+        
+        Returns:
+            list: Results dictionary as from calculate_shortest_path() per 
+                pair, None where no path exists
+        
+        Raises:
+            ValueError: If origins and destinations differ in length
+        """
+        origins, destinations = list(origins), list(destinations)
+        if len(origins) != len(destinations):
+            raise ValueError(f"Got {len(origins)} origins but "
+                             f"{len(destinations)} destinations")
+        if len(origins) == 0:
+            return []
+        origin_pts = np.asarray(origins, dtype=np.float64).reshape(-1, 2)
+        dest_pts = np.asarray(destinations, dtype=np.float64).reshape(-1, 2)
+        sources = self._nearest_idx(origin_pts[:, 0], origin_pts[:, 1])
+        targets = self._nearest_idx(dest_pts[:, 0], dest_pts[:, 1])
+        
+        unique_sources, rows = np.unique(sources, return_inverse=True)
+        _, predecessors = csgraph.dijkstra(self._weight_matrix(weight), 
+                                           indices=unique_sources, 
+                                           return_predecessors=True)
+        
+        results = []
+        for origin, dest, row, source, target in zip(origins, destinations, rows, 
+                                                     sources, targets):
+            route_idx = self._route_from_predecessors(predecessors[row], source, target)
+            results.append(None if route_idx is None 
+                           else self._path_results(origin, dest, route_idx))
+        logger.debug("Found %d of %d paths", 
+                     sum(r is not None for r in results), len(results))
         return results
     
     def plot_shortest_path(self, path_results, figsize=(12, 12), 
@@ -112,27 +632,38 @@ class ShortestPathGenerator:
             save_path: Optional path to save the figure
         """
         if path_results is None:
-            print("No path to plot!")
+            logger.warning("No path to plot!")
             return
         
-        print("\n=== Generating Visualization ===")
+        # matplotlib is only needed here, keep it off the import path
+        import matplotlib.pyplot as plt
+        from matplotlib.collections import LineCollection
+        from matplotlib.lines import Line2D
         
-        # Create figure
-        fig, ax = ox.plot_graph(
-            self.G, 
-            figsize=figsize,
-            node_size=0,
-            edge_linewidth=0.5,
-            edge_color='#CCCCCC',
-            bgcolor='white',
-            show=False,
-            close=False
-        )
+        # Route bounding box padded by 5%, the graph is labelled by node position
+        route_idx = [self._node_to_idx[node] for node in path_results['route_nodes']]
+        route_xy = self._node_xy[route_idx]
+        (south, west), (north, east) = route_xy.min(axis=0), route_xy.max(axis=0)
+        pad_lat = max(0.05 * (north - south), 0.001)
+        pad_lon = max(0.05 * (east - west), 0.001)
+        south, north, west, east = south - pad_lat, north + pad_lat, west - pad_lon, east + pad_lon
+        
+        # Create figure, drawing only the streets touching the bounding box 
+        # as straight segments between their nodes
+        fig, ax = plt.subplots(figsize=figsize, facecolor='white')
+        ax.set_facecolor('white')
+        lat, lon = self._node_xy[:, 0], self._node_xy[:, 1]
+        inside = (lat >= south) & (lat <= north) & (lon >= west) & (lon <= east)
+        rows = np.repeat(np.arange(len(inside)), np.diff(self._indptr))
+        shown = inside[rows] | inside[self._indices]
+        segments = np.stack([self._node_xy[rows[shown]][:, ::-1], 
+                             self._node_xy[self._indices[shown]][:, ::-1]], axis=1)
+        ax.add_collection(LineCollection(segments, colors='#CCCCCC', linewidths=0.5, zorder=1))
         
         # Plot the shortest path route
         ox.plot_graph_route(
             self.G,
-            path_results['route_nodes'],
+            route_idx,
             route_linewidth=route_linewidth,
             node_size=0,
             bgcolor='white',
@@ -144,21 +675,27 @@ class ShortestPathGenerator:
             close=False
         )
         
+        # Frame the bounding box, correcting the aspect for latitude
+        ax.set_xlim(west, east)
+        ax.set_ylim(south, north)
+        ax.set_aspect(1 / np.cos(np.radians((south + north) / 2)))
+        ax.axis('off')
+        
         # Add origin and destination markers
-        origin_node = path_results['origin_node']
-        dest_node = path_results['dest_node']
+        origin_lat, origin_lon = route_xy[0]
+        dest_lat, dest_lon = route_xy[-1]
         
         ax.scatter(
-            self.G.nodes[origin_node]['x'], 
-            self.G.nodes[origin_node]['y'],
+            origin_lon, 
+            origin_lat,
             c='green', s=node_size * 6, marker='o', 
             zorder=5, edgecolors='black', linewidths=2,
             label='Origin'
         )
         
         ax.scatter(
-            self.G.nodes[dest_node]['x'], 
-            self.G.nodes[dest_node]['y'],
+            dest_lon, 
+            dest_lat,
             c='red', s=node_size * 6, marker='s', 
             zorder=5, edgecolors='black', linewidths=2,
             label='Destination'
@@ -185,10 +722,9 @@ class ShortestPathGenerator:
         
         if save_path:
             plt.savefig(save_path, dpi=300, bbox_inches='tight')
-            print(f"Figure saved to: {save_path}")
+            logger.info("Figure saved to: %s", save_path)
         
         plt.show()
-        print("Visualization complete!")
     
     def get_route_details(self, path_results):
         """
@@ -205,28 +741,36 @@ class ShortestPathGenerator:
         
         segments = []
         route = path_results['route_nodes']
+        route_idx = [self._node_to_idx[node] for node in route]
+        lengths = self._edge_lengths(route_idx).tolist()
+        coords = list(map(tuple, self._node_xy[route_idx].tolist()))
+        adj = self.G_simple.adj
+        append = segments.append
         
         for i in range(len(route) - 1):
-            edge = self.G[route[i]][route[i + 1]][0]
+            edge = adj[route_idx[i]][route_idx[i + 1]]
+            length = lengths[i]
             
             segment = {
                 'segment': i + 1,
                 'from_node': route[i],
                 'to_node': route[i + 1],
-                'from_coords': (self.G.nodes[route[i]]['y'], self.G.nodes[route[i]]['x']),
-                'to_coords': (self.G.nodes[route[i + 1]]['y'], self.G.nodes[route[i + 1]]['x']),
-                'length_m': edge['length'],
-                'length_km': edge['length'] / 1000,
+                'from_coords': coords[i],
+                'to_coords': coords[i + 1],
+                'length_m': length,
+                'length_km': length / 1000,
                 'street_name': edge.get('name', 'Unnamed'),
                 'highway_type': edge.get('highway', 'Unknown')
             }
-            segments.append(segment)
+            append(segment)
         
         return segments
 
 
 # Example usage
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    
     # User-provided coordinates
     ORIGIN = (33.7902, -84.3880)      # Example: Near Piedmont Park, Atlanta
     DESTINATION = (33.7490, -84.3880)  # Example: Midtown Atlanta
@@ -240,6 +784,7 @@ if __name__ == "__main__":
     
     # Plot the path
     if results:
+        print(f"Distance: {results['distance_km']:.2f} km over {results['num_edges']} edges")
         path_gen.plot_shortest_path(results, save_path='shortest_path.png')
         
         # Get detailed route information
@@ -0,0 +1,239 @@
+
+from __future__ import annotations
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Set
+import uuid
+import numpy as np
+import shapely
+import geopandas as gpd
+from shapely import geometry
+from trackmarks.core import unit_reg
+from trackmarks.core.spatial import Ellipse, DEFAULT_EPSG_CRS
+from trackmarks.core.store import TrackStore
+from trackmarks.core.track import Plot
+from trackmarks.core.trackable import Trackable, TrackHistory, \
+    DurableIdentifier, DurableTrackable, TransientTrackable
+
+def _to_ns(dt: datetime) -> int:
+    return int(np.datetime64(dt, 'ns').astype(np.int64))
+
+def _from_ns(ns: int) -> datetime:
+    return np.datetime64(int(ns), 'ns').astype('datetime64[us]').item()
+
+
+class ColumnarTrackHistory(TrackHistory):
+    """
+    Plots of a single track, read from the columns of a ColumnarTrackStore.
+    Plot objects are only materialized when iterated.
+    """
+
+    def __init__(self, store: ColumnarTrackStore, rows: np.ndarray,
+                 after: datetime = None, before: datetime = None,
+                 *args, **kwargs):
+        super().__init__(after, before, *args, **kwargs)
+        self.store = store
+        self.rows = rows
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __iter__(self) -> Iterator[Plot]:
+        return (self.store._plot(row) for row in self.rows)
+
+    def as_gdf(self) -> gpd.GeoDataFrame:
+        return self.store._as_gdf(self.rows)
+
+
+@dataclass
+class ColumnarDurableTrackable(DurableTrackable):
+
+    _store: ColumnarTrackStore = field(default=None, repr=False, compare=False)
+
+    def get_plots(self, after: datetime = None,
+                  before: datetime = None) -> ColumnarTrackHistory:
+        return self._store.get_plots(self, after, before)
+
+@dataclass
+class ColumnarTransientTrackable(TransientTrackable):
+
+    _store: ColumnarTrackStore = field(default=None, repr=False, compare=False)
+
+    def get_plots(self, after: datetime = None,
+                  before: datetime = None) -> ColumnarTrackHistory:
+        return self._store.get_plots(self, after, before)
+
+
+class ColumnarTrackStore(TrackStore):
+    """
+    In-memory TrackStore holding plots as columns rather than objects.
+
+    Every plot is a row across contiguous arrays: owning track index,
+    centroid lon/lat, semi axes (meters), orientation, first/last observed
+    (int64 ns) plus a shapely point array of the centroids. Spatial and
+    temporal filters are evaluated as vectorized masks over all plots.
+    """
+
+    _FLOAT_COLUMNS = ('lon', 'lat', 'semi_major', 'semi_minor', 'orientation')
+    _INT_COLUMNS = ('track', 'first_observed', 'last_observed')
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._trackables: List[Trackable] = []
+        self._track_idx: Dict[uuid.UUID, int] = {}
+        self._columns = {name: np.empty(0, dtype=np.float64)
+                         for name in self._FLOAT_COLUMNS}
+        self._columns.update({name: np.empty(0, dtype=np.int64)
+                              for name in self._INT_COLUMNS})
+        self._points = np.empty(0, dtype=object)
+        self._sources = []
+        self._pending = []
+
+    def create(self, trackable: Trackable) -> Trackable:
+        if trackable._guid not in self._track_idx:
+            self._track_idx[trackable._guid] = len(self._trackables)
+            self._trackables.append(trackable)
+        return trackable
+
+    def new_durable_track(self, identifiers: Set[DurableIdentifier]) \
+        -> DurableTrackable:
+        return self.create(ColumnarDurableTrackable(first_observed=None,
+                                                    last_observed=None,
+                                                    last_known_position=None,
+                                                    identifiers=identifiers,
+                                                    _store=self))
+
+    def new_transient_track(self) -> TransientTrackable:
+        return self.create(ColumnarTransientTrackable(first_observed=None,
+                                                      last_observed=None,
+                                                      last_known_position=None,
+                                                      _store=self))
+
+    def add_plots(self, trackable: Trackable, plots: Iterable[Plot]) -> None:
+        """
+        Append plots to a track, updating its observation window and last
+        known position. Plots are buffered and appended to the columns on
+        the next query.
+        """
+        track = self._track_idx[self.create(trackable)._guid]
+        for plot in plots:
+            self._pending.append((track, plot))
+            if trackable.first_observed is None \
+                or plot.first_observed < trackable.first_observed:
+                trackable.first_observed = plot.first_observed
+            if trackable.last_observed is None \
+                or plot.last_observed >= trackable.last_observed:
+                trackable.last_observed = plot.last_observed
+                trackable.last_known_position = plot.location
+
+    def get_durable_tracks(self, identifiers: Set[DurableIdentifier] = None,
+                           aoi: geometry.Polygon = None,
+                           after: datetime = None,
+                           before: datetime = None) -> Iterable[DurableTrackable]:
+        tracks = self._select_tracks(DurableTrackable, aoi, after, before)
+        if identifiers is None:
+            return tracks
+        # identifiers are unhashable dataclasses, so match by equality
+        return [track for track in tracks
+                if any(i == j for i in identifiers for j in track.identifiers)]
+
+    def get_transient_tracks(self, aoi: geometry.Polygon = None,
+                             after: datetime = None,
+                             before: datetime = None) \
+        -> Iterable[TransientTrackable]:
+        return self._select_tracks(TransientTrackable, aoi, after, before)
+
+    def get_plots(self, trackable: Trackable, after: datetime = None,
+                  before: datetime = None) -> ColumnarTrackHistory:
+        mask = self._mask(after=after, before=before)
+        mask &= self._columns['track'] == self._track_idx[trackable._guid]
+        rows = np.flatnonzero(mask)
+        rows = rows[np.argsort(self._columns['first_observed'][rows],
+                               kind='stable')]
+        return ColumnarTrackHistory(self, rows, after, before)
+
+    def as_gdf(self) -> gpd.GeoDataFrame:
+        """All plots, sharing the store's point array as the geometry."""
+        self._flush()
+        return self._as_gdf(slice(None))
+
+    def _select_tracks(self, kind: type, aoi: Optional[geometry.Polygon],
+                       after: Optional[datetime],
+                       before: Optional[datetime]) -> List[Trackable]:
+        candidates = [track for track in self._trackables
+                      if isinstance(track, kind)]
+        if aoi is None and after is None and before is None:
+            return candidates
+        mask = self._mask(aoi, after, before)
+        selected = set(np.unique(self._columns['track'][mask]).tolist())
+        return [track for track in candidates
+                if self._track_idx[track._guid] in selected]
+
+    def _mask(self, aoi: geometry.Polygon = None, after: datetime = None,
+              before: datetime = None) -> np.ndarray:
+        """Rows observed within the aoi and overlapping [after, before]."""
+        self._flush()
+        mask = np.ones(len(self._points), dtype=bool)
+        if aoi is not None:
+            # prepared once, the aoi is indexed for the bulk predicate
+            shapely.prepare(aoi)
+            mask &= shapely.contains(aoi, self._points)
+        if after is not None:
+            mask &= self._columns['last_observed'] >= _to_ns(after)
+        if before is not None:
+            mask &= self._columns['first_observed'] <= _to_ns(before)
+        return mask
+
+    def _flush(self) -> None:
+        """Append buffered plots to the columns."""
+        if not self._pending:
+            return
+        tracks, plots = zip(*self._pending)
+        count = len(plots)
+        new = {
+            'track': np.array(tracks, dtype=np.int64),
+            'lon': np.fromiter((p.location.centroid.x for p in plots),
+                               dtype=np.float64, count=count),
+            'lat': np.fromiter((p.location.centroid.y for p in plots),
+                               dtype=np.float64, count=count),
+            'semi_major': np.fromiter(
+                (p.location.semi_major.to(unit_reg.meter).magnitude for p in plots),
+                dtype=np.float64, count=count),
+            'semi_minor': np.fromiter(
+                (p.location.semi_minor.to(unit_reg.meter).magnitude for p in plots),
+                dtype=np.float64, count=count),
+            'orientation': np.fromiter((p.location.orientation for p in plots),
+                                       dtype=np.float64, count=count),
+            'first_observed': np.fromiter((_to_ns(p.first_observed) for p in plots),
+                                          dtype=np.int64, count=count),
+            'last_observed': np.fromiter((_to_ns(p.last_observed) for p in plots),
+                                         dtype=np.int64, count=count),
+        }
+        for name, values in new.items():
+            self._columns[name] = np.concatenate([self._columns[name], values])
+        self._points = np.concatenate([self._points,
+                                       shapely.points(new['lon'], new['lat'])])
+        self._sources.extend(p.source for p in plots)
+        self._pending.clear()
+
+    def _plot(self, row: int) -> Plot:
+        columns = self._columns
+        return Plot(location=Ellipse(centroid=self._points[row],
+                                     semi_major=columns['semi_major'][row] * unit_reg.meter,
+                                     semi_minor=columns['semi_minor'][row] * unit_reg.meter,
+                                     orientation=columns['orientation'][row]),
+                    first_observed=_from_ns(columns['first_observed'][row]),
+                    last_observed=_from_ns(columns['last_observed'][row]),
+                    source=self._sources[row])
+
+    def _as_gdf(self, rows) -> gpd.GeoDataFrame:
+        columns = self._columns
+        return gpd.GeoDataFrame(
+            {'track': [self._trackables[i]._guid for i in columns['track'][rows]],
+             'first_observed': columns['first_observed'][rows].astype('datetime64[ns]'),
+             'last_observed': columns['last_observed'][rows].astype('datetime64[ns]'),
+             'semi_major': columns['semi_major'][rows],
+             'semi_minor': columns['semi_minor'][rows],
+             'orientation': columns['orientation'][rows]},
+            geometry=gpd.array.from_shapely(self._points[rows],
+                                            crs=DEFAULT_EPSG_CRS))
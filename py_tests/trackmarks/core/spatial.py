@@ -1,6 +1,8 @@
+import dataclasses
 import unittest
 from trackmarks.core import unit_reg
 from trackmarks.core.spatial import Ellipse, OptimalReprojector
+import shapely
 from shapely import geometry
 from shapely.ops import transform
 
@@ -20,6 +22,32 @@ class EllipseLazyTest(unittest.TestCase):
     def test_lazy_caching(self):
 
         print(f'{self.ellipse.ellipse})')
+        self.assertIs(self.ellipse.ellipse, self.ellipse.ellipse)
+
+    def test_asdict_before_access(self):
+        self.assertIsNone(dataclasses.asdict(self.ellipse)['_lazy_ellipse'])
+        self.assertIsNotNone(self.ellipse.ellipse)
+        
+    def test_batch_generate(self):
+        ellipses = [self.ellipse,
+                    Ellipse(centroid=geometry.Point(151.21, -33.87),
+                            semi_major=3 * unit_reg.nautical_mile,
+                            semi_minor=1 * unit_reg.nautical_mile)]
+        for batched, ellipse in zip(Ellipse.batch_generate(ellipses), ellipses):
+            self.assertTrue(batched.equals_exact(ellipse.generate_ellipse(), 1e-9))
+
+    def test_near_default_orientation_not_rotated(self):
+        unrotated = Ellipse(centroid=self.centroid_4326,
+                            semi_major=2 * unit_reg.nautical_mile,
+                            semi_minor=1 * unit_reg.nautical_mile)
+        nearly = Ellipse(centroid=self.centroid_4326,
+                         semi_major=2 * unit_reg.nautical_mile,
+                         semi_minor=1 * unit_reg.nautical_mile, 
+                         orientation=5e-10)
+        self.assertTrue(nearly.ellipse.equals_exact(unrotated.ellipse, 0))
+        
+    def test_batch_generate_empty(self):
+        self.assertEqual(Ellipse.batch_generate([]), [])
 
     
     # def test_ellipse_generation(self):
@@ -28,6 +56,31 @@ class EllipseLazyTest(unittest.TestCase):
     #                            semi_minor=1 * unit_reg.nautical_mile, 
     #                            orientation=10))
 
+class OptimalReprojectorTest(unittest.TestCase):
+    
+    def test_transformer_caching(self):
+        proj = OptimalReprojector()
+        first = proj.get_optimal_transformers(geometry.Point(-84.39, 33.75))
+        second = proj.get_optimal_transformers(geometry.Point(-84.20, 33.90))
+        self.assertIs(first, second)
+    
+    def test_transformers_shared_across_reprojectors(self):
+        point = geometry.Point(151.21, -33.87)
+        first = OptimalReprojector().get_optimal_transformers(point)
+        second = OptimalReprojector().get_optimal_transformers(point)
+        self.assertIs(first, second)
+        self.assertEqual(first[0].target_crs.to_epsg(), 32756)
+    
+    def test_apply_geometry_keeps_z(self):
+        point = geometry.Point(-84.39, 33.75, 100)
+        moved = OptimalReprojector().apply_geometry(
+            point, lambda geom: shapely.transform(geom, lambda xyz: xyz + [10, 10, 0], 
+                                                 include_z=True))
+        self.assertTrue(moved.has_z)
+        self.assertAlmostEqual(moved.z, 100)
+        self.assertFalse(OptimalReprojector().apply_geometry(
+            geometry.Point(-84.39, 33.75), lambda geom: geom).has_z)
+
 if __name__ == '__main__':
     unittest.main() 
         
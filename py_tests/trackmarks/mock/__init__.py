@@ -0,0 +1,43 @@
+import networkx as nx
+import numpy as np
+import osmnx as ox
+
+def synthetic_graph(n=6, step=0.002, oneway_share=0.3, seed=0):
+    """
+    Grid of streets with OSM style node ids, a share of them one-way, a 
+    parallel edge, a zero-length edge, a dead end sink and an unreachable 
+    pair. Lengths are 1.1 to 1.5 times the great circle distance.
+    """
+    rng = np.random.default_rng(seed)
+    G = nx.MultiDiGraph(crs='epsg:4326')
+    node = lambda i, j: 1000 + 37 * i + j
+    for i in range(n):
+        for j in range(n):
+            G.add_node(node(i, j), y=33.75 + i * step, x=-84.40 + j * step)
+    
+    def add_street(u, v, oneway=False, scale=None):
+        length = ox.distance.great_circle(G.nodes[u]['y'], G.nodes[u]['x'], 
+                                          G.nodes[v]['y'], G.nodes[v]['x'])
+        length *= rng.uniform(1.1, 1.5) if scale is None else scale
+        speed = rng.uniform(5, 20)
+        for a, b in [(u, v)] if oneway else [(u, v), (v, u)]:
+            G.add_edge(a, b, length=length, travel_time=length / speed)
+    
+    for i in range(n):
+        for j in range(n):
+            if j + 1 < n:
+                add_street(node(i, j), node(i, j + 1), oneway=rng.random() < oneway_share)
+            if i + 1 < n:
+                add_street(node(i, j), node(i + 1, j), oneway=rng.random() < oneway_share)
+    add_street(node(0, 0), node(0, 1), oneway=True, scale=3.0)
+    
+    # a node on top of another joined by zero-length edges
+    G.add_node(5000, **G.nodes[node(2, 2)])
+    add_street(node(2, 2), 5000, scale=0.0)
+    # a sink only entered from the grid, and a pair off the grid
+    G.add_node(6000, y=33.75 - step, x=-84.40)
+    add_street(node(0, 0), 6000, oneway=True)
+    G.add_node(7000, y=33.75 + (n + 1) * step, x=-84.40)
+    G.add_node(7001, y=33.75 + (n + 1) * step, x=-84.40 + step)
+    add_street(7000, 7001, oneway=True)
+    return G
@@ -0,0 +1,88 @@
+import unittest
+import numpy as np
+import pandas as pd
+from trackmarks.mock.mockTrackGenerator import VehicleTrajectoryGenerator, _simulate
+# run as a script, the fixtures of this test package are its __init__
+from __init__ import synthetic_graph
+
+class SimulateTest(unittest.TestCase):
+    
+    def simulate(self, path_distances, node_xy, velocities=10.0, 
+                 max_travel_s=30, rest_s=60):
+        # without velocity variation or noise, at 10 m/s 100 m per 10 s sample
+        return _simulate(np.asarray(path_distances, dtype=np.float64), 
+                         np.asarray(node_xy, dtype=np.float64), velocities, 10, 
+                         max_travel_s, rest_s, 0.0, 1.0, 1.0, 
+                         np.random.default_rng(0))
+        
+    def test_samples_and_rests(self):
+        vehicles, t_offsets, lats, lons, velocities, rested, arrivals = self.simulate(
+            [0.0, 400.0, 1000.0], [(-84.40, 33.75), (-84.40, 33.76), (-84.39, 33.76)])
+        
+        # samples every 100 m up to but not including the end of the path
+        self.assertEqual(len(t_offsets), 10)
+        np.testing.assert_array_equal(vehicles, 0)
+        np.testing.assert_allclose(velocities, 10.0)
+        # a rest is taken after every 3 samples, before the 4th, 7th and 10th
+        np.testing.assert_allclose(t_offsets, np.arange(10) * 10 + np.arange(10) // 3 * 60)
+        np.testing.assert_array_equal(np.flatnonzero(rested), [3, 6, 9])
+        np.testing.assert_allclose(arrivals, [10 * 10 + 3 * 60])
+        
+        # positions interpolated along each leg of the path
+        np.testing.assert_allclose(lats[:5], [33.75, 33.7525, 33.755, 33.7575, 33.76])
+        np.testing.assert_allclose(lons[:5], -84.40)
+        np.testing.assert_allclose(lons[9], -84.40 + 0.01 * 5 / 6)
+        
+    def test_no_rest_within_travel_duration(self):
+        _, t_offsets, _, _, _, rested, arrivals = self.simulate(
+            [0.0, 1000.0], [(-84.40, 33.75), (-84.39, 33.75)], max_travel_s=3600)
+        np.testing.assert_allclose(t_offsets, np.arange(10) * 10)
+        self.assertFalse(rested.any())
+        np.testing.assert_allclose(arrivals, [100])
+        
+    def test_vehicles_grouped(self):
+        vehicles, t_offsets, lats, _, _, rested, arrivals = self.simulate(
+            [0.0, 1000.0], [(-84.40, 33.75), (-84.40, 33.76)], velocities=[10.0, 25.0])
+        
+        # the second vehicle samples every 250 m, from its own departure
+        np.testing.assert_array_equal(vehicles, [0] * 10 + [1] * 4)
+        np.testing.assert_allclose(t_offsets[10:], [0, 10, 20, 90])
+        np.testing.assert_allclose(lats[10:], [33.75, 33.7525, 33.755, 33.7575])
+        np.testing.assert_array_equal(np.flatnonzero(rested), [3, 6, 9, 13])
+        np.testing.assert_allclose(arrivals, [10 * 10 + 3 * 60, 4 * 10 + 60])
+        
+    def test_zero_length_path(self):
+        vehicles, t_offsets, lats, lons, velocities, rested, arrivals = self.simulate(
+            [0.0], [(-84.40, 33.75)])
+        for values in (vehicles, t_offsets, lats, lons, velocities, rested):
+            self.assertEqual(len(values), 0)
+        np.testing.assert_allclose(arrivals, [0])
+
+class VehicleTrajectoryGeneratorTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.gen = VehicleTrajectoryGenerator(graph=synthetic_graph(n=8, oneway_share=0))
+        
+    def generate(self, **kwargs):
+        return self.gen.generate_trajectories(
+            (33.7505, -84.3995), (33.7635, -84.3865), num_vehicles=4, 
+            max_travel_duration=1, rest_duration=1, sample_interval=10, 
+            seed=42, **kwargs)
+        
+    def test_seeded_runs_reproducible(self):
+        trajectories = self.generate()
+        self.assertEqual(sorted(trajectories['uid'].unique()), [1, 2, 3, 4])
+        pd.testing.assert_frame_equal(trajectories, self.generate())
+        
+    def test_vehicles_arrive_at_destination(self):
+        trajectories = self.generate()
+        last = trajectories.groupby('uid').tail(1)
+        self.assertEqual(len(last), 4)
+        np.testing.assert_allclose(last['velocity_kmh'], 0)
+        dest = self.gen.G.nodes[self.gen.get_nearest_node(33.7635, -84.3865)]
+        np.testing.assert_allclose(last['lat'], dest['y'])
+        np.testing.assert_allclose(last['lng'], dest['x'])
+        self.assertTrue(trajectories.groupby('uid')['datetime'].is_monotonic_increasing.all())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,157 @@
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+import osmnx as ox
+from scipy.sparse import csgraph
+from scipy.spatial import cKDTree
+from trackmarks.mock.osm2graph import ShortestPathGenerator, _ZOrderIndex, _astar
+# run as a script, the fixtures of this test package are its __init__
+from __init__ import synthetic_graph
+
+class ZOrderIndexTest(unittest.TestCase):
+    
+    def assertMatchesKDTree(self, points, queries):
+        dist, idx = _ZOrderIndex(points).query(queries)
+        kd_dist, _ = cKDTree(points).query(queries)
+        np.testing.assert_allclose(dist, kd_dist)
+        np.testing.assert_allclose(np.linalg.norm(points[idx] - queries, axis=1), 
+                                   kd_dist)
+        
+    def test_random_points(self):
+        rng = np.random.default_rng(0)
+        points = rng.uniform(0, 5000, (5000, 2))
+        # across the quadrant boundaries at the centre and the points themselves
+        queries = np.vstack([rng.uniform(0, 5000, (500, 2)), 
+                             rng.normal(2500, 10, (100, 2)), points[:50]])
+        self.assertMatchesKDTree(points, queries)
+        
+    def test_queries_outside_extent(self):
+        rng = np.random.default_rng(1)
+        points = rng.normal(0, 1000, (2000, 2))
+        self.assertMatchesKDTree(points, rng.uniform(-20000, 20000, (500, 2)))
+        
+    def test_duplicate_points(self):
+        rng = np.random.default_rng(2)
+        points = np.round(rng.uniform(0, 5000, (3000, 2)) / 250) * 250
+        self.assertMatchesKDTree(points, np.vstack([rng.uniform(-500, 5500, (500, 2)), 
+                                                    points[:20]]))
+        
+    def test_single_point(self):
+        points = np.array([[10.0, 20.0]])
+        self.assertMatchesKDTree(points, np.array([[10.0, 20.0], [-5.0, 100.0]]))
+
+class ShortestPathGeneratorTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.gen = ShortestPathGenerator(graph=synthetic_graph(), num_landmarks=4)
+        
+    def route_cost(self, weight, route):
+        if len(route) < 2:
+            return 0.0
+        weights = self.gen._weight_matrix(weight)[route[:-1], route[1:]]
+        return np.asarray(weights, dtype=np.float64).sum()
+        
+    def test_astar_matches_dijkstra(self):
+        gen = self.gen
+        for weight in ('length', 'travel_time'):
+            csr = gen._weight_matrix(weight)
+            expected = csgraph.dijkstra(csr)
+            # the second call computes the landmarks
+            gen._landmark_distances(weight)
+            landmarks = gen._landmark_distances(weight)
+            self.assertEqual(len(landmarks[0]), 4)
+            for lm_from, lm_to in [(gen._no_landmarks, gen._no_landmarks), landmarks]:
+                for src in range(csr.shape[0]):
+                    for dst in range(csr.shape[0]):
+                        cost, pred = _astar(csr.indptr, csr.indices, csr.data, 
+                                            lm_from, lm_to, gen._node_rad, gen._cos_lat, 
+                                            gen._geo_scale(weight), src, dst)
+                        self.assertAlmostEqual(cost, expected[src, dst], places=6)
+                        if np.isfinite(cost):
+                            route = gen._route_from_predecessors(pred, src, dst)
+                            self.assertAlmostEqual(self.route_cost(weight, route), 
+                                                   cost, places=6)
+                            
+    def test_repeated_queries_use_landmarks(self):
+        gen = self.gen
+        rng = np.random.default_rng(1)
+        for weight in ('length', 'travel_time'):
+            expected = csgraph.dijkstra(gen._weight_matrix(weight))
+            found = 0
+            for _ in range(60):
+                origin, dest = gen._node_xy[rng.integers(len(gen._node_xy), size=2)]
+                result = gen.calculate_shortest_path(tuple(origin), tuple(dest), weight=weight)
+                source, target = (gen._node_to_idx[node] for node in 
+                                  gen.get_nearest_node([origin[0], dest[0]], 
+                                                       [origin[1], dest[1]]))
+                if result is None:
+                    self.assertTrue(np.isinf(expected[source, target]))
+                    continue
+                found += 1
+                route = [gen._node_to_idx[node] for node in result['route_nodes']]
+                self.assertEqual((route[0], route[-1]), (source, target))
+                self.assertAlmostEqual(self.route_cost(weight, route), 
+                                       expected[source, target], places=6)
+            self.assertGreater(found, 0)
+            self.assertIsInstance(gen._landmarks[weight], tuple)
+            
+    def test_batched_paths_match_single(self):
+        gen = self.gen
+        rng = np.random.default_rng(2)
+        coords = [tuple(xy) for xy in gen._node_xy]
+        origins = [coords[i] for i in rng.integers(len(coords), size=40)]
+        destinations = [coords[i] for i in rng.integers(len(coords), size=40)]
+        # into the pair off the grid, and out of the dead end sink
+        unreachable = [gen._node_to_idx[7000], gen._node_to_idx[6000]]
+        origins += [coords[0], coords[unreachable[1]]]
+        destinations += [coords[unreachable[0]], coords[0]]
+        
+        for weight in ('length', 'travel_time'):
+            batched = gen.calculate_shortest_paths(iter(origins), iter(destinations), 
+                                                   weight=weight)
+            self.assertEqual(len(batched), len(origins))
+            self.assertIsNone(batched[-2])
+            self.assertIsNone(batched[-1])
+            for origin, dest, result in zip(origins, destinations, batched):
+                single = gen.calculate_shortest_path(origin, dest, weight=weight)
+                if single is None:
+                    self.assertIsNone(result)
+                    continue
+                self.assertEqual((result['origin_node'], result['dest_node']), 
+                                 (single['origin_node'], single['dest_node']))
+                self.assertEqual(result['dest_coords'], dest)
+                route = [gen._node_to_idx[node] for node in result['route_nodes']]
+                single_route = [gen._node_to_idx[node] for node in single['route_nodes']]
+                self.assertAlmostEqual(self.route_cost(weight, route), 
+                                       self.route_cost(weight, single_route), places=6)
+                
+    def test_batched_paths_unpaired(self):
+        with self.assertRaises(ValueError):
+            self.gen.calculate_shortest_paths([(33.75, -84.40)] * 3, [(33.76, -84.39)] * 2)
+        self.assertEqual(self.gen.calculate_shortest_paths([], []), [])
+
+class GraphCacheTest(unittest.TestCase):
+    
+    def test_cached_construction_matches_download(self):
+        args = dict(distance=1000, center_point=(33.755, -84.395))
+        with tempfile.TemporaryDirectory() as cache_dir:
+            with mock.patch.object(ox, 'graph_from_point', 
+                                   return_value=synthetic_graph()) as download:
+                downloaded = ShortestPathGenerator(cache_dir=cache_dir, **args)
+                cached = ShortestPathGenerator(cache_dir=cache_dir, **args)
+            self.assertEqual(download.call_count, 1)
+        
+        for name in ('_osm_ids', '_indptr', '_indices', '_weights', 
+                     '_node_xy', '_node_xy_proj'):
+            np.testing.assert_array_equal(getattr(cached, name), getattr(downloaded, name))
+        self.assertEqual(cached._to_proj.target_crs, downloaded._to_proj.target_crs)
+        origin, dest = (33.7505, -84.3995), (33.7595, -84.3905)
+        for weight in ('length', 'travel_time'):
+            expected = downloaded.calculate_shortest_path(origin, dest, weight=weight)
+            result = cached.calculate_shortest_path(origin, dest, weight=weight)
+            self.assertEqual(result['route_nodes'], expected['route_nodes'])
+            self.assertAlmostEqual(result['distance_meters'], expected['distance_meters'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import unittest
+from datetime import datetime
+from trackmarks.core import unit_reg
+from trackmarks.core.spatial import Ellipse
+from trackmarks.core.track import Plot, PlotSource
+from trackmarks.core.trackable import DurableIdentifier
+from trackmarks.stores.columnar import ColumnarTrackStore
+from shapely import geometry
+
+class ColumnarTrackStoreTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.store = ColumnarTrackStore()
+        self.source = PlotSource(system='mock', version=1)
+        self.durable = self.store.new_durable_track(
+            [DurableIdentifier(identifier='1', system='mock')])
+        self.transient = self.store.new_transient_track()
+        self.store.add_plots(self.durable, [self.plot(-84.39, 33.75, 8),
+                                            self.plot(-84.30, 33.80, 9)])
+        self.store.add_plots(self.transient, [self.plot(-80.00, 30.00, 10)])
+        
+    def plot(self, lon, lat, hour):
+        return Plot(location=Ellipse(centroid=geometry.Point(lon, lat),
+                                     semi_major=2 * unit_reg.nautical_mile,
+                                     semi_minor=1 * unit_reg.nautical_mile),
+                    first_observed=datetime(2024, 1, 1, hour),
+                    last_observed=datetime(2024, 1, 1, hour, 30),
+                    source=self.source)
+        
+    def test_aoi_filter(self):
+        aoi = geometry.box(-84.5, 33.7, -84.35, 33.77)
+        self.assertEqual(self.store.get_durable_tracks(aoi=aoi), [self.durable])
+        self.assertEqual(self.store.get_transient_tracks(aoi=aoi), [])
+        
+    def test_time_filter(self):
+        after = datetime(2024, 1, 1, 9, 45)
+        self.assertEqual(self.store.get_durable_tracks(after=after), [])
+        self.assertEqual(self.store.get_transient_tracks(after=after), 
+                         [self.transient])
+        
+    def test_identifier_filter(self):
+        found = self.store.get_durable_tracks(
+            identifiers=[DurableIdentifier(identifier='1', system='mock')])
+        self.assertEqual(found, [self.durable])
+        
+    def test_get_plots(self):
+        plots = list(self.durable.get_plots(before=datetime(2024, 1, 1, 8, 45)))
+        self.assertEqual(len(plots), 1)
+        self.assertEqual(plots[0].first_observed, datetime(2024, 1, 1, 8))
+        self.assertAlmostEqual(plots[0].location.semi_major.to(unit_reg.nautical_mile).magnitude, 2)
+        self.assertEqual(len(self.durable.get_plots().as_gdf()), 2)
+        self.assertEqual(self.durable.last_known_position.centroid, 
+                         geometry.Point(-84.30, 33.80))
+
+if __name__ == '__main__':
+    unittest.main() 